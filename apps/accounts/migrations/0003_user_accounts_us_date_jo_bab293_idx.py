@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_bio_profile_picture'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined'], name='accounts_us_date_jo_bab293_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 05:56
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_accounts_us_date_jo_bab293_idx'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_user_email_upper_idx'),
+        ),
+    ]
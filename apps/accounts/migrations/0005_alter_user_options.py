@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_accounts_user_email_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'verbose_name': 'User', 'verbose_name_plural': 'Users'},
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+
+def check_case_duplicate_emails(apps, schema_editor):
+    """
+    Stop before adding the constraint if emails differ only by case.
+
+    Such accounts have to be merged or renamed by hand first; listing them
+    here beats failing halfway through with an IntegrityError.
+    """
+    User = apps.get_model('accounts', 'User')
+    users = User.objects.using(schema_editor.connection.alias)
+    duplicate_keys = (
+        users.values(email_upper=Upper('email'))
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values('email_upper')
+    )
+    duplicates = list(
+        users.annotate(email_upper=Upper('email'))
+        .filter(email_upper__in=duplicate_keys)
+        .values_list('email', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot make emails case-insensitively unique; merge or rename the '
+            'accounts sharing these emails first: ' + ', '.join(sorted(duplicates))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_accounts_user_email_trgm_idx_and_more'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicate_emails, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='accounts_user_email_upper_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('email'), name='accounts_user_email_upper_uniq'),
+        ),
+    ]
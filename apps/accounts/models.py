@@ -6,9 +6,14 @@ Supports multiple authentication providers (email, Google OAuth).
 """
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+# Bound once at import; normalize_email is a classmethod with no manager state.
+_normalize_email = BaseUserManager.normalize_email
+
 
 class UserManager(BaseUserManager):
     """
@@ -33,11 +38,12 @@ class UserManager(BaseUserManager):
         if not email:
             raise ValueError('The Email field must be set')
         
-        email = self.normalize_email(email)
-        extra_fields.setdefault('is_active', True)
-        extra_fields.setdefault('is_staff', False)
-        
-        user = self.model(email=email, **extra_fields)
+        user = self.model(
+            email=_normalize_email(email),
+            is_active=extra_fields.pop('is_active', True),
+            is_staff=extra_fields.pop('is_staff', False),
+            **extra_fields
+        )
         
         if password:
             user.set_password(password)
@@ -154,7 +160,26 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
-        ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['-date_joined']),
+            # Trigram indexes back the admin's `icontains` searches on users
+            # (and on user__email / user__full_name from related admins),
+            # which compile to UPPER(col) LIKE UPPER('%q%').
+            GinIndex(
+                OpClass(Upper('email'), name='gin_trgm_ops'),
+                name='accounts_user_email_trgm_idx'
+            ),
+            GinIndex(
+                OpClass(Upper('full_name'), name='gin_trgm_ops'),
+                name='accounts_user_name_trgm_idx'
+            ),
+        ]
+        constraints = [
+            # Emails are unique regardless of case. The index behind this
+            # also backs `email__iexact` lookups, which Django compiles to
+            # UPPER(email) = UPPER(%s) on PostgreSQL.
+            models.UniqueConstraint(Upper('email'), name='accounts_user_email_upper_uniq'),
+        ]
 
     def __str__(self):
         return self.email
@@ -166,3 +191,34 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         """Return the user's email as a short identifier."""
         return self.email
+
+    def to_api_dict(self):
+        """
+        Return the user as a plain dict matching UserSerializer output.
+
+        Used by the register/login/Google endpoints, which serialize without
+        a request, so the auth hot path skips DRF field introspection.
+        `has_preferences` is read from the annotation or attribute set by
+        the accounts serializers when present.
+        """
+        date_joined = timezone.localtime(self.date_joined).isoformat()
+        if date_joined.endswith('+00:00'):
+            date_joined = date_joined[:-6] + 'Z'
+        picture_url = self.profile_picture.url if self.profile_picture else None
+        has_preferences = getattr(self, 'has_preferences', None)
+        if has_preferences is None:
+            has_preferences = getattr(self, 'preferences', None) is not None
+        return {
+            'id': self.id,
+            'email': self.email,
+            'full_name': self.full_name,
+            'bio': self.bio,
+            'profile_picture': picture_url,
+            'profile_picture_url': picture_url or self.google_picture_url or None,
+            'google_picture_url': self.google_picture_url,
+            'is_active': self.is_active,
+            'is_staff': self.is_staff,
+            'date_joined': date_joined,
+            'auth_provider': self.auth_provider,
+            'has_preferences': has_preferences,
+        }
@@ -3,18 +3,74 @@ Serializers for User authentication.
 
 Handles validation and serialization for:
 - User registration
-- User login (JWT token generation)
+- User login (credential validation)
 - User profile retrieval
 - Google OAuth authentication
 """
 
+import hashlib
+
+import requests
+from requests.adapters import HTTPAdapter
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
-from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from apps.preferences.models import Preference
 
 User = get_user_model()
 
+GOOGLE_USERINFO_URL = 'https://www.googleapis.com/oauth2/v3/userinfo'
+GOOGLE_REQUEST_TIMEOUT = (2.0, 5.0)  # (connect, read) seconds
+GOOGLE_USERINFO_CACHE_TIMEOUT = 300  # 5 minutes, well inside the token lifetime
+
+# Shared session so repeated Google logins reuse pooled keep-alive
+# connections instead of paying a new TCP + TLS handshake each time.
+_google_session = requests.Session()
+_google_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
+# Columns rendered by UserSerializer; everything else (e.g. last_login,
+# is_superuser) stays deferred when a user is fetched only to be displayed.
+PROFILE_USER_FIELDS = (
+    'id',
+    'email',
+    'full_name',
+    'bio',
+    'profile_picture',
+    'google_picture_url',
+    'is_active',
+    'is_staff',
+    'date_joined',
+    'auth_provider',
+)
+
+# Login additionally needs the password hash to check credentials.
+LOGIN_USER_FIELDS = PROFILE_USER_FIELDS + ('password',)
+
+
+class GoogleServiceUnavailable(APIException):
+    """Raised when Google's userinfo endpoint cannot be reached."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Google authentication is temporarily unavailable. Please try again.'
+    default_code = 'google_unavailable'
+
+
+def annotate_has_preferences(queryset):
+    """
+    Annotate `has_preferences` on a User queryset.
+
+    UserSerializer reads the annotation directly, so serializing a user
+    fetched through this queryset costs no extra reverse one-to-one query.
+    """
+    return queryset.annotate(
+        has_preferences=Exists(Preference.objects.filter(user=OuterRef('pk')))
+    )
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     """
@@ -42,16 +98,15 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['email', 'full_name', 'password', 'password_confirm']
         extra_kwargs = {
-            'email': {'required': True},
+            # Uniqueness is enforced by the database constraint in create()
+            # rather than a separate SELECT before the INSERT.
+            'email': {'required': True, 'validators': []},
             'full_name': {'required': True},
         }
 
     def validate_email(self, value):
-        """Ensure email is lowercase and unique."""
-        email = value.lower()
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError('A user with this email already exists.')
-        return email
+        """Normalize email to lowercase."""
+        return value.lower()
 
     def validate(self, attrs):
         """Validate that passwords match."""
@@ -64,12 +119,20 @@ class RegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create and return the new user."""
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            full_name=validated_data.get('full_name', ''),
-            auth_provider=User.AuthProvider.EMAIL
-        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    full_name=validated_data.get('full_name', ''),
+                    auth_provider=User.AuthProvider.EMAIL
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'email': ['A user with this email already exists.']
+            })
+        # A freshly registered user cannot have preferences yet.
+        user.has_preferences = False
         return user
 
 
@@ -100,7 +163,9 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         try:
-            user = User.objects.get(email=email)
+            user = annotate_has_preferences(
+                User.objects.only(*LOGIN_USER_FIELDS)
+            ).get(email__iexact=email)
         except User.DoesNotExist:
             raise serializers.ValidationError({
                 'email': 'No account found with this email address.'
@@ -126,18 +191,14 @@ class LoginSerializer(serializers.Serializer):
         attrs['user'] = user
         return attrs
 
-    def get_tokens(self, user):
-        """Generate JWT tokens for the user."""
-        refresh = RefreshToken.for_user(user)
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        }
-
 
 class UserSerializer(serializers.ModelSerializer):
     """
     Read-only serializer for user profile data.
+
+    `has_preferences` is read from an annotation when present; fetch
+    instances through `annotate_has_preferences()` or set the attribute
+    explicitly to avoid a query for the related preferences.
     """
     has_preferences = serializers.SerializerMethodField()
     profile_picture_url = serializers.SerializerMethodField()
@@ -160,10 +221,6 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
-    def get_has_preferences(self, obj):
-        """Check if the user has created preferences."""
-        return hasattr(obj, 'preferences')
-
     def get_profile_picture_url(self, obj):
         """
         Returns the best available profile picture URL:
@@ -178,6 +235,13 @@ class UserSerializer(serializers.ModelSerializer):
             return obj.google_picture_url
         return None
 
+    def get_has_preferences(self, obj):
+        """Use the annotation if present, else check the related preferences."""
+        has_preferences = getattr(obj, 'has_preferences', None)
+        if has_preferences is None:
+            has_preferences = getattr(obj, 'preferences', None) is not None
+        return has_preferences
+
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     """
@@ -238,7 +302,7 @@ class UpdateEmailSerializer(serializers.Serializer):
 
     def validate_new_email(self, value):
         email = value.lower()
-        if User.objects.filter(email=email).exists():
+        if User.objects.filter(email__iexact=email).exists():
             raise serializers.ValidationError('This email is already in use.')
         return email
 
@@ -259,66 +323,79 @@ class GoogleAuthSerializer(serializers.Serializer):
     def validate_access_token(self, value):
         """
         Verify the Google Access Token and extract user information.
+
+        Rejected tokens raise a validation error (400); network failures
+        talking to Google raise GoogleServiceUnavailable (503). Successful
+        lookups are cached under a hash of the token, so retries and SPA
+        reloads with the same token skip the round-trip to Google.
         """
-        import requests
-        from django.conf import settings
+        token_hash = hashlib.sha256(value.encode()).hexdigest()[:32]
+        cache_key = f"google_userinfo_{token_hash}"
+        cached_info = cache.get(cache_key)
+        if cached_info is not None:
+            return cached_info
 
         try:
             # Verify the token and get user info
-            response = requests.get(
-                'https://www.googleapis.com/oauth2/v3/userinfo',
-                params={'access_token': value}
+            response = _google_session.get(
+                GOOGLE_USERINFO_URL,
+                params={'access_token': value},
+                timeout=GOOGLE_REQUEST_TIMEOUT
             )
+        except requests.exceptions.RequestException:
+            raise GoogleServiceUnavailable()
 
-            if not response.ok:
-                raise serializers.ValidationError('Invalid Google access token.')
+        if not response.ok:
+            raise serializers.ValidationError('Invalid Google access token.')
 
+        try:
             user_info = response.json()
-            
-            # Optional: Check audience if you want to be extra secure using tokeninfo endpoint
-            # For now, userinfo availability implies validity of the token for the user
-
-            if 'email' not in user_info:
-                raise serializers.ValidationError('Token does not contain email.')
-
-            return {
-                'email': user_info.get('email'),
-                'full_name': user_info.get('name', ''),
-                'google_id': user_info.get('sub'),
-                'picture_url': user_info.get('picture', ''),
-            }
+        except ValueError:
+            raise serializers.ValidationError('Invalid Google access token.')
+
+        # Optional: Check audience if you want to be extra secure using tokeninfo endpoint
+        # For now, userinfo availability implies validity of the token for the user
 
-        except Exception as e:
-            raise serializers.ValidationError(f'Invalid Google token: {str(e)}')
+        if 'email' not in user_info:
+            raise serializers.ValidationError('Token does not contain email.')
+
+        google_data = {
+            'email': user_info.get('email'),
+            'full_name': user_info.get('name', ''),
+            'google_id': user_info.get('sub'),
+            'picture_url': user_info.get('picture', ''),
+        }
+        cache.set(cache_key, google_data, GOOGLE_USERINFO_CACHE_TIMEOUT)
+        return google_data
 
     def create(self, validated_data):
         """
         Get or create a user based on Google account information.
+
+        Sets `self.created` so the view can report whether a new account
+        was registered without probing the database a second time.
         """
         google_data = validated_data['access_token']
         email = google_data['email'].lower()
 
-        try:
-            user = User.objects.get(email=email)
+        # One round-trip for returning users; an atomic insert for new ones.
+        user, self.created = annotate_has_preferences(User.objects.all()).get_or_create(
+            email__iexact=email,
+            defaults={
+                'email': email,
+                'full_name': google_data['full_name'],
+                'auth_provider': User.AuthProvider.GOOGLE,
+                'google_picture_url': google_data.get('picture_url', ''),
+                # Google users have no local password
+                'password': make_password(None),
+            }
+        )
+
+        if self.created:
+            user.has_preferences = False
+        elif google_data.get('picture_url') and not user.google_picture_url:
             # Update Google picture if not already set
-            if google_data.get('picture_url') and not user.google_picture_url:
-                user.google_picture_url = google_data['picture_url']
-                user.save(update_fields=['google_picture_url'])
-        except User.DoesNotExist:
-            # Create new user from Google data
-            user = User.objects.create_user(
-                email=email,
-                full_name=google_data['full_name'],
-                auth_provider=User.AuthProvider.GOOGLE,
-                google_picture_url=google_data.get('picture_url', '')
-            )
+            user.google_picture_url = google_data['picture_url']
+            user.save(update_fields=['google_picture_url'])
 
         return user
-
-    def get_tokens(self, user):
-        """Generate JWT tokens for the user."""
-        refresh = RefreshToken.for_user(user)
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        }
@@ -1,3 +1,58 @@
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.preferences.models import Preference
+from .models import User
+from .serializers import UserSerializer, annotate_has_preferences
+
+
+class EmailUniquenessTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', password='pw', full_name='Me')
+        self.client = APIClient()
+
+    def _login(self, email):
+        return self.client.post(
+            '/api/auth/login/',
+            {'email': email, 'password': 'pw'},
+            format='json'
+        )
+
+    def test_email_unique_regardless_of_case(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(email='ME@example.com', password='pw', full_name='Me')
+
+    def test_login_ignores_email_case(self):
+        self.assertEqual(self._login('Me@Example.com').status_code, 200)
+
+
+class UserSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', password='pw', full_name='Me')
+
+    def test_has_preferences_without_annotation(self):
+        self.assertIs(UserSerializer(User.objects.get(pk=self.user.pk)).data['has_preferences'], False)
+        Preference.objects.create(
+            user=self.user,
+            budget_range=Preference.BudgetRange.choices[0][0],
+            travel_style=Preference.TravelStyle.choices[0][0],
+            preferred_trip_duration=Preference.Duration.choices[0][0],
+        )
+        self.assertIs(UserSerializer(User.objects.get(pk=self.user.pk)).data['has_preferences'], True)
+
+    def _annotated_user(self):
+        return annotate_has_preferences(User.objects.all()).get(pk=self.user.pk)
+
+    def test_to_api_dict_matches_serializer(self):
+        user = self._annotated_user()
+        self.assertEqual(user.to_api_dict(), UserSerializer(user).data)
+
+    def test_to_api_dict_matches_serializer_with_pictures(self):
+        self.user.google_picture_url = 'https://example.com/google.jpg'
+        self.user.save(update_fields=['google_picture_url'])
+        user = self._annotated_user()
+        self.assertEqual(user.to_api_dict(), UserSerializer(user).data)
+
+        user.profile_picture = 'profile_pictures/me.jpg'
+        self.assertEqual(user.to_api_dict(), UserSerializer(user).data)
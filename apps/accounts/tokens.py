@@ -0,0 +1,22 @@
+"""
+JWT helpers for the accounts app.
+
+All authentication endpoints issue their token pair through `issue_tokens`
+so signing logic lives in one place.
+"""
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def issue_tokens(user):
+    """
+    Generate a JWT refresh/access token pair for the user.
+
+    Returns:
+        dict: { 'refresh': str, 'access': str }
+    """
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
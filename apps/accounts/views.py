@@ -8,11 +8,16 @@ Provides endpoints for:
 - Google OAuth authentication
 """
 
+import hashlib
+import json
+
 from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import get_user_model
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 
 from .serializers import (
     RegisterSerializer,
@@ -22,7 +27,10 @@ from .serializers import (
     ProfileUpdateSerializer,
     ChangePasswordSerializer,
     UpdateEmailSerializer,
+    PROFILE_USER_FIELDS,
+    annotate_has_preferences,
 )
+from .tokens import issue_tokens
 
 User = get_user_model()
 
@@ -56,15 +64,11 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate tokens for immediate login after registration
-        from rest_framework_simplejwt.tokens import RefreshToken
-        refresh = RefreshToken.for_user(user)
+        tokens = issue_tokens(user)
         
         return Response({
-            'user': UserSerializer(user).data,
-            'tokens': {
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-            },
+            'user': user.to_api_dict(),
+            'tokens': tokens,
             'message': 'Registration successful.',
         }, status=status.HTTP_201_CREATED)
 
@@ -96,10 +100,10 @@ class LoginView(APIView):
         serializer.is_valid(raise_exception=True)
         
         user = serializer.validated_data['user']
-        tokens = serializer.get_tokens(user)
+        tokens = issue_tokens(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': user.to_api_dict(),
             'tokens': tokens,
             'message': 'Login successful.',
         }, status=status.HTTP_200_OK)
@@ -117,6 +121,9 @@ class UserDetailView(generics.RetrieveAPIView):
     Response (200 OK):
         - User object (id, email, full_name, bio, profile_picture_url, ...)
     
+    Response (304 Not Modified):
+        - If-None-Match matches the ETag of the current profile payload
+    
     Response (401 Unauthorized):
         - Authentication credentials were not provided
     """
@@ -128,7 +135,25 @@ class UserDetailView(generics.RetrieveAPIView):
         return {'request': self.request}
 
     def get_object(self):
-        return self.request.user
+        return annotate_has_preferences(
+            User.objects.only(*PROFILE_USER_FIELDS)
+        ).get(pk=self.request.user.pk)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+
+        # User has no modification timestamp, so the ETag is derived from the
+        # payload itself; clients revalidate and get a body-less 304 when
+        # nothing changed.
+        payload = json.dumps(response.data, sort_keys=True, default=str)
+        etag = quote_etag(hashlib.md5(payload.encode()).hexdigest())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
 
 
 class ProfileUpdateView(generics.UpdateAPIView):
@@ -240,16 +265,12 @@ class GoogleAuthView(APIView):
         serializer = GoogleAuthSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Check if user already exists
-        email = serializer.validated_data['access_token']['email'].lower()
-        user_exists = User.objects.filter(email=email).exists()
-        
         user = serializer.save()
-        tokens = serializer.get_tokens(user)
+        tokens = issue_tokens(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': user.to_api_dict(),
             'tokens': tokens,
             'message': 'Google authentication successful.',
-            'created': not user_exists,
+            'created': serializer.created,
         }, status=status.HTTP_200_OK)
@@ -1,34 +1,87 @@
 from django.contrib import admin
+from django.db.models import Count
+from django.db.models.functions import Substr
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import ChatbotConversation, ChatbotMessage
 
+# Number of most recent messages rendered inline on a conversation page.
+INLINE_MESSAGE_LIMIT = 50
+
+
+class RecentMessagesFormSet(BaseInlineFormSet):
+    """Inline formset limited to the latest INLINE_MESSAGE_LIMIT messages."""
+
+    def get_queryset(self):
+        # The inline queryset is filtered by conversation after
+        # ModelAdmin.get_queryset(), so the slice has to happen here.
+        if not hasattr(self, '_queryset'):
+            recent = self.queryset.order_by('-created_at')[:INLINE_MESSAGE_LIMIT]
+            self._queryset = list(reversed(recent))
+        return self._queryset
+
 
 class ChatbotMessageInline(admin.TabularInline):
     model = ChatbotMessage
+    formset = RecentMessagesFormSet
     extra = 0
+    max_num = INLINE_MESSAGE_LIMIT
     readonly_fields = ['role', 'content', 'created_at']
     can_delete = False
+    show_change_link = True
 
 
 @admin.register(ChatbotConversation)
 class ChatbotConversationAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'title', 'message_count', 'created_at', 'updated_at']
+    list_select_related = ['user']
     list_filter = ['created_at']
     search_fields = ['user__email', 'title']
-    readonly_fields = ['created_at', 'updated_at']
+    ordering = ['-updated_at']
+    autocomplete_fields = ['user']
+    readonly_fields = ['created_at', 'updated_at', 'all_messages_link']
     inlines = [ChatbotMessageInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user').annotate(
+            _message_count=Count('messages')
+        )
     
     def message_count(self, obj):
-        return obj.messages.count()
+        return obj._message_count
     message_count.short_description = 'Messages'
+    message_count.admin_order_field = '_message_count'
+
+    def all_messages_link(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:assistant_chatbotmessage_changelist')
+        return format_html(
+            '<a href="{}?conversation__id__exact={}">View all messages</a> '
+            '(only the latest {} are shown below)',
+            url, obj.pk, INLINE_MESSAGE_LIMIT
+        )
+    all_messages_link.short_description = 'Messages'
 
 
 @admin.register(ChatbotMessage)
 class ChatbotMessageAdmin(admin.ModelAdmin):
     list_display = ['id', 'conversation', 'role', 'content_preview', 'created_at']
+    list_select_related = ['conversation__user']
     list_filter = ['role', 'created_at']
     search_fields = ['content', 'conversation__user__email']
+    autocomplete_fields = ['conversation']
     readonly_fields = ['created_at']
+
+    def get_queryset(self, request):
+        # Truncate in SQL so the changelist never loads full message bodies;
+        # one extra character tells us whether to append an ellipsis.
+        return super().get_queryset(request).defer('content').annotate(
+            _preview=Substr('content', 1, 101)
+        )
     
     def content_preview(self, obj):
-        return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
+        preview = obj._preview
+        return preview[:100] + '...' if len(preview) > 100 else preview
     content_preview.short_description = 'Content'
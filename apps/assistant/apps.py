@@ -5,3 +5,7 @@ class AssistantConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.assistant'
     verbose_name = 'AI Travel Assistant'
+    
+    def ready(self):
+        # Import signals when app is ready
+        import apps.assistant.signals  # noqa: F401
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0002_chatbotconversation_last_buddy_offset'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatbotconversation',
+            index=models.Index(fields=['user', '-updated_at'], name='assistant_c_user_id_5c9424_idx'),
+        ),
+    ]
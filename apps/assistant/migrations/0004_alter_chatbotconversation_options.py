@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0003_chatbotconversation_assistant_c_user_id_5c9424_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='chatbotconversation',
+            options={'verbose_name': 'Assistant Conversation', 'verbose_name_plural': 'Assistant Conversations'},
+        ),
+    ]
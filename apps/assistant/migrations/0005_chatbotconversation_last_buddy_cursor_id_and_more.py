@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0004_alter_chatbotconversation_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatbotconversation',
+            name='last_buddy_cursor_id',
+            field=models.IntegerField(blank=True, help_text='User ID of the last buddy suggestion shown', null=True),
+        ),
+        migrations.AddField(
+            model_name='chatbotconversation',
+            name='last_buddy_cursor_score',
+            field=models.FloatField(blank=True, help_text='Match score of the last buddy suggestion shown', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistant', '0005_chatbotconversation_last_buddy_cursor_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatbotconversation',
+            name='recent_messages',
+            field=models.JSONField(blank=True, default=list, help_text='Most recent messages as {role, content} entries, used for prompt history'),
+        ),
+    ]
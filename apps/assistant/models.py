@@ -29,13 +29,30 @@ class ChatbotConversation(models.Model):
         default=0,
         help_text='Pagination offset for buddy suggestions'
     )
+    last_buddy_cursor_score = models.FloatField(
+        null=True,
+        blank=True,
+        help_text='Match score of the last buddy suggestion shown'
+    )
+    last_buddy_cursor_id = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text='User ID of the last buddy suggestion shown'
+    )
+    recent_messages = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Most recent messages as {role, content} entries, used for prompt history'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-updated_at']
         verbose_name = 'Assistant Conversation'
         verbose_name_plural = 'Assistant Conversations'
+        indexes = [
+            models.Index(fields=['user', '-updated_at']),
+        ]
 
     def __str__(self):
         return f"Conversation {self.id} - {self.user.email}"
@@ -72,5 +89,10 @@ class ChatbotMessage(models.Model):
         verbose_name_plural = 'Assistant Messages'
 
     def __str__(self):
-        preview = self.content[:50] + '...' if len(self.content) > 50 else self.content
+        # The admin changelist defers `content` and annotates a SQL-truncated
+        # `_preview`; prefer it so rendering a row doesn't refetch the body.
+        content = getattr(self, '_preview', None)
+        if content is None:
+            content = self.content
+        preview = content[:50] + '...' if len(content) > 50 else content
         return f"[{self.role}] {preview}"
@@ -16,17 +16,31 @@ class ChatbotMessageSerializer(serializers.ModelSerializer):
 
 
 class ChatbotConversationSerializer(serializers.ModelSerializer):
-    """Serializer for assistant conversations with recent messages."""
-    messages = ChatbotMessageSerializer(many=True, read_only=True)
+    """Serializer for assistant conversation details; the view adds a page of messages."""
     message_count = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatbotConversation
-        fields = ['id', 'title', 'created_at', 'updated_at', 'message_count', 'messages']
+        fields = ['id', 'title', 'created_at', 'updated_at', 'message_count']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_message_count(self, obj):
-        return obj.messages.count()
+        # Views annotate `_message_count`; fall back to a COUNT query otherwise.
+        count = getattr(obj, '_message_count', None)
+        if count is None:
+            count = obj.messages.count()
+        return count
+
+
+class ChatbotConversationListSerializer(serializers.ModelSerializer):
+    """Serializer for the conversation list: counts and last message, no message bodies."""
+    message_count = serializers.IntegerField(source='_message_count', read_only=True)
+    last_message = serializers.CharField(source='_last_message', read_only=True, allow_null=True)
+    
+    class Meta:
+        model = ChatbotConversation
+        fields = ['id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message']
+        read_only_fields = fields
 
 
 class AssistantChatRequestSerializer(serializers.Serializer):
@@ -40,6 +54,17 @@ class AssistantChatRequestSerializer(serializers.Serializer):
         allow_null=True,
         help_text='Optional: continue existing conversation'
     )
+    stream = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Optional: stream the reply as server-sent events'
+    )
+    background = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Optional: generate the reply in the background and poll for it; '
+                  'needs a shared cache such as Redis, otherwise the request gets 503'
+    )
 
 
 class AssistantChatResponseSerializer(serializers.Serializer):
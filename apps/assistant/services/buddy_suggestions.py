@@ -5,144 +5,133 @@ Provides buddy match suggestions with pagination support.
 """
 
 import logging
+from itertools import islice
 from typing import Dict, List, Optional, Tuple
-from django.db.models import Q
 
 from apps.buddies.models import BuddyMatch, BuddyRequest
-from apps.buddies.services import BuddyMatchingService
+from apps.buddies.services import BuddyMatchingService, get_buddy_relation_maps
 
 logger = logging.getLogger(__name__)
 
 # Default batch size for buddy suggestions
 DEFAULT_BATCH_SIZE = 3
 
+# Conversation fields holding buddy suggestion pagination state
+BUDDY_PAGINATION_FIELDS = ['last_buddy_offset', 'last_buddy_cursor_score', 'last_buddy_cursor_id']
 
-def is_buddy_request(message: str) -> bool:
-    """
-    Detect if a user message is asking for buddy suggestions.
-    
-    Args:
-        message: The user's message text
-        
-    Returns:
-        True if the message is asking for buddy suggestions
-    """
-    message_lower = message.lower()
-    
-    # Initial buddy request keywords
-    buddy_keywords = [
-        'suggest buddies', 'suggest buddy', 'find buddy', 'find buddies',
-        'recommend buddy', 'recommend buddies', 'travel buddy', 'travel buddies',
-        'compatible buddy', 'compatible buddies', 'match buddy', 'buddy match',
-        'buddy suggestion', 'buddy suggestions', 'who can i travel with',
-        'find travel partner', 'travel companion', 'travel companions'
-    ]
-    
-    return any(keyword in message_lower for keyword in buddy_keywords)
-
+# Initial buddy request keywords
+BUDDY_KEYWORDS = [
+    'suggest buddies', 'suggest buddy', 'find buddy', 'find buddies',
+    'recommend buddy', 'recommend buddies', 'travel buddy', 'travel buddies',
+    'compatible buddy', 'compatible buddies', 'match buddy', 'buddy match',
+    'buddy suggestion', 'buddy suggestions', 'who can i travel with',
+    'find travel partner', 'travel companion', 'travel companions'
+]
 
-def is_more_buddies_request(message: str) -> bool:
-    """
-    Detect if user is asking for more buddy suggestions.
-    
-    Args:
-        message: The user's message text
-        
-    Returns:
-        True if the message is asking for more buddies
-    """
-    message_lower = message.lower()
-    
-    more_keywords = [
-        'show more', 'more buddies', 'more suggestions', 'next buddies',
-        'other buddies', 'more options', 'show others', 'any more',
-        'more matches', 'other matches', 'next batch', 'continue'
-    ]
-    
-    return any(keyword in message_lower for keyword in more_keywords)
+# "Show more" follow-up keywords
+MORE_BUDDIES_KEYWORDS = [
+    'show more', 'more buddies', 'more suggestions', 'next buddies',
+    'other buddies', 'more options', 'show others', 'any more',
+    'more matches', 'other matches', 'next batch', 'continue'
+]
 
 
-def get_buddy_request_status(user, matched_user) -> str:
+def get_buddy_request_statuses(user, matched_user_ids) -> Dict[int, str]:
     """
-    Get the buddy request status between two users.
+    Get buddy request statuses between a user and several potential buddies.
+    
+    Resolves every pair through the shared get_buddy_relation_maps loader.
     
     Args:
         user: Current authenticated user
-        matched_user: Potential buddy
+        matched_user_ids: IDs of the potential buddies
         
     Returns:
-        Status string: 'none', 'pending_outgoing', 'pending_incoming', 'accepted'
+        Dict mapping each matched user ID to its status string
     """
-    # Check for existing BuddyMatch (connected/disconnected)
-    buddy_match = BuddyMatch.objects.filter(
-        (Q(user=user) & Q(matched_user=matched_user)) |
-        (Q(user=matched_user) & Q(matched_user=user))
-    ).first()
-    
-    if buddy_match and buddy_match.status == BuddyMatch.Status.CONNECTED:
-        return 'accepted'
-    
-    # Check for buddy request
-    buddy_req = BuddyRequest.objects.filter(
-        (Q(sender=user) & Q(receiver=matched_user)) |
-        (Q(sender=matched_user) & Q(receiver=user))
-    ).first()
-    
-    if not buddy_req:
-        return 'none'
-    
-    if buddy_req.status == BuddyRequest.Status.ACCEPTED:
-        return 'accepted'
-    
-    if buddy_req.status == BuddyRequest.Status.PENDING:
-        return 'pending_outgoing' if buddy_req.sender == user else 'pending_incoming'
+    ids = list(matched_user_ids)
+    if not ids:
+        return {}
+    
+    match_map, request_map = get_buddy_relation_maps(user, ids)
+    
+    statuses = {}
+    for other_id in ids:
+        buddy_match = match_map.get(other_id)
+        buddy_req = request_map.get(other_id)
+        if buddy_match and buddy_match.status == BuddyMatch.Status.CONNECTED:
+            statuses[other_id] = 'accepted'
+        elif not buddy_req:
+            statuses[other_id] = 'none'
+        elif buddy_req.status == BuddyRequest.Status.ACCEPTED:
+            statuses[other_id] = 'accepted'
+        elif buddy_req.status == BuddyRequest.Status.PENDING:
+            statuses[other_id] = 'pending_outgoing' if buddy_req.sender_id == user.id else 'pending_incoming'
+        else:
+            statuses[other_id] = 'none'
     
-    return 'none'
+    return statuses
 
 
 def get_ranked_buddy_matches(
     user,
     offset: int = 0,
-    limit: int = DEFAULT_BATCH_SIZE
+    limit: int = DEFAULT_BATCH_SIZE,
+    cursor: Optional[Tuple[float, int]] = None
 ) -> Tuple[List[Dict], bool]:
     """
     Get ranked buddy matches for a user with pagination.
     
     Suggests NEW potential buddies (not already connected) based on compatibility scores.
+    Matches are ranked by score descending, then user ID, so a cursor taken
+    from the last shown buddy resumes exactly after it.
     
     Args:
         user: The authenticated user
-        offset: Starting position for pagination
+        offset: Starting position for pagination (ignored when cursor is given)
         limit: Maximum number of matches to return
+        cursor: (match_score, user_id) of the last buddy already shown
         
     Returns:
         Tuple of (list of buddy match dicts, has_more flag)
     """
     # Get all connected users to exclude them from suggestions
-    connected_user_ids = BuddyMatch.objects.filter(
+    connected_user_ids = set(BuddyMatch.objects.filter(
         user=user,
         status=BuddyMatch.Status.CONNECTED
-    ).values_list('matched_user_id', flat=True)
+    ).values_list('matched_user_id', flat=True))
     
     # Calculate compatibility scores for all users with preferences
-    # Get more than needed for filtering
+    # Get more than needed for filtering; users are loaded for the page only
     service = BuddyMatchingService(user)
-    all_matches = service.get_matches(limit=100, min_score=0.0)
+    all_matches = service.get_ranked_matches(limit=100, min_score=0.0)
+    all_matches.sort(key=lambda match: (-match[1], match[0]))
     
     # Filter out already connected users
-    unconnected_matches = [
+    unconnected_matches = (
         match for match in all_matches
-        if match['user'].id not in connected_user_ids
-    ]
-    
-    # Get total count after filtering
-    total_count = len(unconnected_matches)
+        if match[0] not in connected_user_ids
+    )
+    
+    # Seek past the cursor instead of counting off already-shown matches
+    if cursor is not None:
+        cursor_score, cursor_id = cursor
+        unconnected_matches = (
+            match for match in unconnected_matches
+            if match[1] < cursor_score
+            or (match[1] == cursor_score and match[0] > cursor_id)
+        )
+        offset = 0
     
-    # Apply pagination
-    paginated_matches = unconnected_matches[offset:offset + limit]
+    # Take one extra match past the page to tell whether more remain
+    window = list(islice(unconnected_matches, offset, offset + limit + 1))
+    has_more = len(window) > limit
+    paginated_matches = service.build_matches(window[:limit])
     
-    # Check if there are more results
-    has_more = (offset + limit) < total_count
+    # Resolve request statuses for the whole page at once
+    request_statuses = get_buddy_request_statuses(
+        user, [match['user'].id for match in paginated_matches]
+    )
     
     # Build response list
     buddy_list = []
@@ -152,9 +141,6 @@ def get_ranked_buddy_matches(
         # Get user interests (use shared_interests from BuddyMatchingService)
         interests = match['shared_interests'][:5]
         
-        # Get request status
-        request_status = get_buddy_request_status(user, matched_user)
-        
         buddy_list.append({
             'id': matched_user.id,
             'name': matched_user.full_name or matched_user.email.split('@')[0],
@@ -162,7 +148,7 @@ def get_ranked_buddy_matches(
             'avatar': None,  # No avatar in current User model
             'match_score': match['match_score'],
             'tags': interests,
-            'request_status': request_status,
+            'request_status': request_statuses.get(matched_user.id, 'none'),
         })
     
     return buddy_list, has_more
@@ -176,6 +162,9 @@ def build_buddy_response(
     """
     Build a structured buddy suggestion response.
     
+    Updates the conversation's pagination state in memory; the caller saves
+    it (see BUDDY_PAGINATION_FIELDS) together with its own changes.
+    
     Args:
         user: The authenticated user
         conversation: The ChatbotConversation instance
@@ -184,25 +173,33 @@ def build_buddy_response(
     Returns:
         Structured response dict with buddy_cards, or None if not applicable
     """
-    # Determine offset
+    # Determine where the previous batch stopped
+    cursor = None
     if is_more_request:
         offset = conversation.last_buddy_offset
+        if conversation.last_buddy_cursor_id is not None:
+            cursor = (conversation.last_buddy_cursor_score, conversation.last_buddy_cursor_id)
     else:
-        # Reset offset for new buddy request
+        # Reset pagination for new buddy request
         offset = 0
         conversation.last_buddy_offset = 0
+        conversation.last_buddy_cursor_score = None
+        conversation.last_buddy_cursor_id = None
     
     # Get buddy matches
-    buddies, has_more = get_ranked_buddy_matches(user, offset=offset, limit=DEFAULT_BATCH_SIZE)
+    buddies, has_more = get_ranked_buddy_matches(
+        user, offset=offset, limit=DEFAULT_BATCH_SIZE, cursor=cursor
+    )
     
-    # Update offset for next request
+    # Remember the last buddy shown for the next request
     if buddies:
         conversation.last_buddy_offset = offset + len(buddies)
-        conversation.save()
+        conversation.last_buddy_cursor_score = buddies[-1]['match_score']
+        conversation.last_buddy_cursor_id = buddies[-1]['id']
     
     # Build reply text
     if not buddies:
-        if offset == 0:
+        if offset == 0 and cursor is None:
             reply_text = "I couldn't find any buddy matches for you yet. Make sure your travel preferences are set up, and try again later!"
         else:
             reply_text = "You've seen all your compatible travel buddies! Check back later for new matches, or explore your existing connections."
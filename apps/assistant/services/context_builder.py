@@ -6,11 +6,51 @@ for RAG-style (Retrieval-Augmented Generation) responses.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 
 logger = logging.getLogger(__name__)
 
+# Messages kept in a conversation's recent message buffer for prompt history
+RECENT_MESSAGES_LIMIT = 5
+
+# Display labels for preference choices
+BUDGET_DISPLAY = {
+    'low': 'Budget-friendly ($0-$1000)',
+    'medium': 'Medium ($1000-$3000)',
+    'high': 'Luxury ($3000+)'
+}
+DURATION_DISPLAY = {
+    'weekend': 'Weekend trips (2-3 days)',
+    'short': 'Short trips (4-7 days)',
+    'long': 'Long trips (1-2+ weeks)'
+}
+
+# Trips fetched per context build; covers the trip list and weather lookups
+TRIP_FETCH_LIMIT = 10
+
+# Trip columns read by the context text and the weather service
+CONTEXT_TRIP_FIELDS = (
+    'id', 'title', 'destination', 'city', 'region', 'country',
+    'latitude', 'longitude', 'start_date', 'end_date', 'status',
+)
+
+# How long built user context is reused between chat turns (seconds). Signal
+# handlers invalidate it on change, but with a per-process cache such as the
+# default LocMem only the process that handled the change sees the delete;
+# other workers can serve context up to this old until a shared cache is used.
+USER_CONTEXT_CACHE_TIMEOUT = 300
+WEATHER_CONTEXT_CACHE_TIMEOUT = 60
+
+# Fetch weather for several trips concurrently (disable to fetch serially, e.g. in tests)
+PARALLEL_WEATHER_FETCH = getattr(settings, 'ASSISTANT_PARALLEL_WEATHER_FETCH', True)
+
+# Most concurrent weather API requests per context build
+WEATHER_FETCH_WORKERS = 4
+
 # System prompt template with anti-hallucination rules
 SYSTEM_PROMPT = """You are Travel Buddy AI, an intelligent and friendly travel assistant.
 
@@ -43,16 +83,123 @@ Guidelines:
 - Never invent names, dates, or details that aren't in the USER CONTEXT"""
 
 
+def fetch_weather_for_trips(trips) -> list:
+    """
+    Fetch weather for each trip, calling the weather API concurrently when enabled.
+    
+    Fresh cache entries are read in one query and coordinates are resolved
+    in the calling thread; only the API requests for cache misses run in
+    worker threads, so the wait is bounded by the slowest request rather
+    than the sum of all, and the workers never touch the database.
+    
+    Args:
+        trips: List of Trip instances
+        
+    Returns:
+        List of weather data dicts (or None) in the same order as trips
+    """
+    from apps.trips.services.weather_service import weather_service
+    
+    cached = weather_service.get_cached_weather_for_trips(trips)
+    
+    misses = []
+    for trip in trips:
+        if trip.id in cached:
+            continue
+        lat, lon, location_source = weather_service.get_trip_coordinates(trip)
+        if lat is not None and lon is not None:
+            misses.append((trip, lat, lon, location_source))
+    
+    if PARALLEL_WEATHER_FETCH and len(misses) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(misses), WEATHER_FETCH_WORKERS)) as executor:
+            fetched = list(executor.map(
+                lambda miss: weather_service.get_weather_by_coords(miss[1], miss[2]),
+                misses
+            ))
+    else:
+        fetched = [weather_service.get_weather_by_coords(lat, lon) for _, lat, lon, _ in misses]
+    
+    fresh = {}
+    for (trip, _, _, location_source), weather_data in zip(misses, fetched):
+        if weather_data:
+            weather_service.save_trip_weather(trip, weather_data, location_source)
+        fresh[trip.id] = weather_data
+    
+    return [cached.get(trip.id) or fresh.get(trip.id) for trip in trips]
+
+
+def user_context_cache_key(user_id) -> str:
+    """Cache key for the database-backed part of a user's assistant context."""
+    return f"assistant_context_{user_id}"
+
+
+def weather_context_cache_key(user_id) -> str:
+    """Cache key for the weather part of a user's assistant context."""
+    return f"assistant_context_weather_{user_id}"
+
+
+def invalidate_user_context(*user_ids) -> None:
+    """
+    Drop cached assistant context for the given users.
+    
+    Called from signal handlers whenever data shown in the context changes.
+    """
+    keys = []
+    for user_id in user_ids:
+        if user_id is not None:
+            keys.extend([user_context_cache_key(user_id), weather_context_cache_key(user_id)])
+    if keys:
+        cache.delete_many(keys)
+
+
 def build_user_context(user) -> str:
     """
     Build a context string from user's database information.
     
+    The database-backed sections are cached for USER_CONTEXT_CACHE_TIMEOUT
+    and invalidated by signals (see apps.assistant.signals); weather is
+    cached separately for the shorter WEATHER_CONTEXT_CACHE_TIMEOUT.
+    
     Args:
         user: The authenticated user object
         
     Returns:
         Formatted context string with user's travel data
     """
+    cache_key = user_context_cache_key(user.id)
+    cached = cache.get(cache_key)
+    if cached is None:
+        cached = _build_static_context(user)
+        cache.set(cache_key, cached, USER_CONTEXT_CACHE_TIMEOUT)
+    static_parts, weather_trips = cached
+    
+    weather_key = weather_context_cache_key(user.id)
+    weather_part = cache.get(weather_key)
+    if weather_part is None:
+        weather_part = _build_weather_context(weather_trips)
+        cache.set(weather_key, weather_part, WEATHER_CONTEXT_CACHE_TIMEOUT)
+    
+    context_parts = list(static_parts)
+    if weather_part:
+        context_parts.append(weather_part)
+    
+    # Combine all context
+    if context_parts:
+        return "USER CONTEXT:\n" + "\n\n".join(context_parts)
+    
+    return "USER CONTEXT: No additional information available."
+
+
+def _build_static_context(user) -> tuple:
+    """
+    Build the database-backed context sections for a user.
+    
+    Args:
+        user: The authenticated user object
+        
+    Returns:
+        Tuple of (list of context section strings, upcoming trips for weather)
+    """
     context_parts = []
     
     # User basic info
@@ -60,27 +207,21 @@ def build_user_context(user) -> str:
     
     # User preferences
     try:
-        if hasattr(user, 'preferences'):
-            pref = user.preferences
+        # A missing reverse one-to-one raises an AttributeError subclass,
+        # so getattr() both fetches and caches it in one lookup
+        pref = getattr(user, 'preferences', None)
+        if pref is not None:
             pref_info = []
             
             if pref.budget_range:
-                budget_display = {
-                    'low': 'Budget-friendly ($0-$1000)',
-                    'medium': 'Medium ($1000-$3000)',
-                    'high': 'Luxury ($3000+)'
-                }.get(pref.budget_range, pref.budget_range)
+                budget_display = BUDGET_DISPLAY.get(pref.budget_range, pref.budget_range)
                 pref_info.append(f"Budget: {budget_display}")
             
             if pref.travel_style:
                 pref_info.append(f"Travel Style: {pref.travel_style.title()}")
             
             if pref.preferred_trip_duration:
-                duration_display = {
-                    'weekend': 'Weekend trips (2-3 days)',
-                    'short': 'Short trips (4-7 days)',
-                    'long': 'Long trips (1-2+ weeks)'
-                }.get(pref.preferred_trip_duration, pref.preferred_trip_duration)
+                duration_display = DURATION_DISPLAY.get(pref.preferred_trip_duration, pref.preferred_trip_duration)
                 pref_info.append(f"Preferred Duration: {duration_display}")
             
             # Get interests
@@ -94,19 +235,35 @@ def build_user_context(user) -> str:
         logger.warning(f"Failed to fetch preferences: {e}")
     
     # User's trips
+    weather_trips = []
     try:
+        from datetime import date
         from apps.trips.models import Trip, TripMember
         
-        # Get trips where user is creator or accepted member
-        trips = Trip.objects.filter(
-            Q(creator=user) | 
-            Q(members__user=user, members__status=TripMember.MembershipStatus.ACCEPTED)
-        ).distinct().select_related('creator').prefetch_related('members__user')[:5]
+        # Get trips where user is creator or accepted member, fetched once for
+        # both the trip list and the weather section below. Membership is
+        # matched with a subquery so the member count join stays unfiltered.
+        accepted = TripMember.MembershipStatus.ACCEPTED
+        user_trips = Trip.objects.filter(
+            Q(creator=user) |
+            Q(id__in=TripMember.objects.filter(user=user, status=accepted).values('trip_id'))
+        ).annotate(
+            accepted_member_count=Count('members', filter=Q(members__status=accepted))
+        ).only(*CONTEXT_TRIP_FIELDS)
+        fetched_trips = list(user_trips[:TRIP_FETCH_LIMIT])
+        trips = fetched_trips[:5]
+        
+        # Upcoming or currently active trips for weather; only query again
+        # if the fetched window may have cut some of them off
+        today = date.today()
+        weather_trips = [trip for trip in fetched_trips if trip.end_date >= today][:3]
+        if len(weather_trips) < 3 and len(fetched_trips) == TRIP_FETCH_LIMIT:
+            weather_trips = list(user_trips.filter(end_date__gte=today)[:3])
         
         if trips:
             trip_info = []
             for trip in trips:
-                member_count = trip.members.filter(status='accepted').count()
+                member_count = trip.accepted_member_count
                 trip_str = f"{trip.title} - {trip.destination or trip.display_destination}"
                 trip_str += f" ({trip.start_date.strftime('%b %d')} - {trip.end_date.strftime('%b %d, %Y')})"
                 trip_str += f" [{trip.status}, {member_count} members]"
@@ -122,7 +279,9 @@ def build_user_context(user) -> str:
         
         saved = TripSavedDestination.objects.filter(
             saved_by=user
-        ).select_related('destination', 'trip')[:10]
+        ).select_related('destination', 'trip').only(
+            'destination__name', 'destination__city', 'trip__title'
+        )[:10]
         
         if saved:
             dest_info = []
@@ -145,7 +304,9 @@ def build_user_context(user) -> str:
         accepted_buddies = BuddyRequest.objects.filter(
             Q(sender=user, status=BuddyRequest.Status.ACCEPTED) |
             Q(receiver=user, status=BuddyRequest.Status.ACCEPTED)
-        ).select_related('sender', 'receiver')[:5]
+        ).select_related('sender', 'receiver').only(
+            'sender__full_name', 'receiver__full_name'
+        )[:5]
         
         if accepted_buddies:
             buddy_info = []
@@ -208,7 +369,7 @@ def build_user_context(user) -> str:
         
         wishlist_items = Wishlist.objects.filter(
             user=user
-        ).select_related('product')[:5]
+        ).select_related('product').only('product__name', 'product__price')[:5]
         
         if wishlist_items:
             wishlist_info = []
@@ -219,24 +380,22 @@ def build_user_context(user) -> str:
     except Exception as e:
         logger.warning(f"Failed to fetch wishlist: {e}")
     
-    # Weather information for upcoming/active trips
-    try:
-        from datetime import date
-        from apps.trips.models import Trip, TripMember
-        from apps.trips.services.weather_service import weather_service
-        
-        # Get trips that are upcoming or currently active
-        today = date.today()
-        weather_trips = Trip.objects.filter(
-            Q(creator=user) | 
-            Q(members__user=user, members__status=TripMember.MembershipStatus.ACCEPTED)
-        ).filter(
-            end_date__gte=today  # Not yet ended
-        ).distinct()[:3]
+    return context_parts, weather_trips
+
+
+def _build_weather_context(weather_trips) -> str:
+    """
+    Build the weather section for upcoming/active trips.
+    
+    Args:
+        weather_trips: Upcoming or active Trip instances collected with the trips
         
+    Returns:
+        Formatted weather section, or an empty string if nothing is available
+    """
+    try:
         weather_info = []
-        for trip in weather_trips:
-            weather_data = weather_service.get_weather_for_trip(trip)
+        for trip, weather_data in zip(weather_trips, fetch_weather_for_trips(weather_trips)):
             if weather_data:
                 city = weather_data.get('city_name', trip.city or trip.destination)
                 temp = weather_data.get('temperature')
@@ -244,15 +403,11 @@ def build_user_context(user) -> str:
                 weather_info.append(f"{trip.title} ({city}): {temp}°C, {condition}")
         
         if weather_info:
-            context_parts.append("Current Weather at Destinations:\n- " + "\n- ".join(weather_info))
+            return "Current Weather at Destinations:\n- " + "\n- ".join(weather_info)
     except Exception as e:
         logger.warning(f"Failed to fetch weather: {e}")
     
-    # Combine all context
-    if context_parts:
-        return "USER CONTEXT:\n" + "\n\n".join(context_parts)
-    
-    return "USER CONTEXT: No additional information available."
+    return ""
 
 
 def collect_structured_context(user) -> dict:
@@ -280,8 +435,7 @@ def collect_structured_context(user) -> dict:
     
     # Preferences
     try:
-        if hasattr(user, 'preferences'):
-            context['preferences'] = user.preferences
+        context['preferences'] = getattr(user, 'preferences', None)
     except Exception as e:
         logger.warning(f"Failed to collect preferences: {e}")
     
@@ -362,10 +516,31 @@ def collect_structured_context(user) -> dict:
     return context
 
 
-def build_conversation_history(conversation, limit: int = 5) -> str:
+def history_entry(role: str, content: str) -> dict:
+    """Build a recent-message entry, truncating long messages for history."""
+    content = content[:500] + "..." if len(content) > 500 else content
+    return {'role': role, 'content': content}
+
+
+def append_recent_messages(conversation, *entries) -> None:
+    """
+    Append entries to the conversation's recent message buffer in memory.
+    
+    Keeps only the last RECENT_MESSAGES_LIMIT entries; the caller saves
+    the `recent_messages` field.
+    """
+    recent = list(conversation.recent_messages or []) + list(entries)
+    conversation.recent_messages = recent[-RECENT_MESSAGES_LIMIT:]
+
+
+def build_conversation_history(conversation, limit: int = RECENT_MESSAGES_LIMIT) -> str:
     """
     Build conversation history string from recent messages.
     
+    Reads the conversation's recent message buffer; conversations that
+    predate it are loaded from the database once and the buffer is seeded
+    from the result.
+    
     Args:
         conversation: ChatbotConversation instance
         limit: Maximum number of previous messages to include
@@ -376,18 +551,20 @@ def build_conversation_history(conversation, limit: int = 5) -> str:
     if not conversation:
         return ""
     
-    messages = conversation.messages.order_by('-created_at')[:limit]
-    messages = list(reversed(messages))  # Oldest first
+    entries = conversation.recent_messages
+    if not entries and conversation.pk:
+        messages = conversation.messages.order_by('-created_at')[:RECENT_MESSAGES_LIMIT]
+        entries = [history_entry(msg.role, msg.content) for msg in reversed(messages)]  # Oldest first
+        conversation.recent_messages = entries
     
-    if not messages:
+    entries = entries[-limit:] if limit > 0 else []
+    if not entries:
         return ""
     
     history_parts = ["CONVERSATION HISTORY:"]
-    for msg in messages:
-        role_label = "User" if msg.role == 'user' else "Assistant"
-        # Truncate long messages in history
-        content = msg.content[:500] + "..." if len(msg.content) > 500 else msg.content
-        history_parts.append(f"{role_label}: {content}")
+    for entry in entries:
+        role_label = "User" if entry['role'] == 'user' else "Assistant"
+        history_parts.append(f"{role_label}: {entry['content']}")
     
     return "\n".join(history_parts)
 
@@ -418,7 +595,7 @@ def build_full_prompt(
     structured_context = collect_structured_context(user)
     
     # Build conversation history
-    history = build_conversation_history(conversation, limit=5)
+    history = build_conversation_history(conversation, limit=RECENT_MESSAGES_LIMIT)
     
     # Combine into full prompt
     prompt_parts = [user_context]
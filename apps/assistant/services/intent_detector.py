@@ -9,6 +9,8 @@ import re
 import logging
 from typing import Literal
 
+from .buddy_suggestions import BUDDY_KEYWORDS, MORE_BUDDIES_KEYWORDS
+
 logger = logging.getLogger(__name__)
 
 # Intent types
@@ -80,6 +82,50 @@ GENERAL_KEYWORDS = [
 ]
 
 
+# Chat message kinds for classify_message, in precedence order: buddy
+# suggestion requests first, then the fallback response categories
+MESSAGE_KEYWORDS = [
+    ('more_buddies', MORE_BUDDIES_KEYWORDS),
+    ('buddy_request', BUDDY_KEYWORDS),
+    ('plan', ['plan', 'planning', 'create trip', 'new trip']),
+    ('buddy', ['buddy', 'buddies', 'friend', 'partner', 'companion']),
+    ('itinerary', ['itinerary', 'optimize', 'schedule', 'order']),
+    ('destination', ['destination', 'recommend', 'suggest', 'where', 'place']),
+]
+
+# One lookahead alternation tried at every position; at each position the
+# first (highest precedence) kind that matches is reported
+_MESSAGE_KIND_RE = re.compile(
+    '(?=' + '|'.join(
+        f"(?P<{kind}>" + '|'.join(re.escape(keyword) for keyword in keywords) + ')'
+        for kind, keywords in MESSAGE_KEYWORDS
+    ) + ')',
+    re.IGNORECASE
+)
+
+
+def classify_message(message: str) -> str:
+    """
+    Classify a chat message in a single scan.
+    
+    Keywords match anywhere in the message, case-insensitively; when several
+    kinds match, the earliest entry in MESSAGE_KEYWORDS wins.
+    
+    Args:
+        message: The user's message
+        
+    Returns:
+        'more_buddies' or 'buddy_request' for buddy suggestion requests,
+        otherwise a fallback category ('plan', 'buddy', 'itinerary',
+        'destination') or 'default'
+    """
+    found = {match.lastgroup for match in _MESSAGE_KIND_RE.finditer(message)}
+    for kind, _ in MESSAGE_KEYWORDS:
+        if kind in found:
+            return kind
+    return 'default'
+
+
 def detect_intent(message: str) -> tuple[IntentType, str]:
     """
     Detect the intent of a user message.
@@ -4,10 +4,13 @@ Ollama LLM Integration Service.
 Handles communication with local Ollama server for AI responses.
 """
 
+import json
 import logging
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, Optional
 from django.conf import settings
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,10 @@ OLLAMA_BASE_URL = getattr(settings, 'OLLAMA_BASE_URL', 'http://localhost:11434')
 OLLAMA_MODEL = getattr(settings, 'OLLAMA_MODEL', 'llama3')
 OLLAMA_TIMEOUT = getattr(settings, 'OLLAMA_TIMEOUT', 120)  # 2 minutes timeout
 
+# Availability probe results are shared across requests for a short while
+AVAILABILITY_CACHE_KEY = 'ollama:available'
+AVAILABILITY_CACHE_TIMEOUT = 15  # seconds
+
 
 class OllamaService:
     """
@@ -26,6 +33,12 @@ class OllamaService:
         self.base_url = OLLAMA_BASE_URL
         self.model = OLLAMA_MODEL
         self.timeout = OLLAMA_TIMEOUT
+        
+        # Keep-alive session so chat turns reuse connections to the server
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def generate(
         self,
@@ -65,7 +78,7 @@ class OllamaService:
             url = f"{self.base_url}/api/generate"
             logger.info(f"Sending request to Ollama: {url}")
             
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=payload,
                 timeout=self.timeout
@@ -76,10 +89,12 @@ class OllamaService:
             generated_text = result.get('response', '')
             
             logger.info(f"Ollama response received, length: {len(generated_text)}")
+            cache.set(AVAILABILITY_CACHE_KEY, True, AVAILABILITY_CACHE_TIMEOUT)
             return generated_text.strip()
             
         except requests.exceptions.ConnectionError:
             logger.error("Failed to connect to Ollama server. Is it running?")
+            cache.set(AVAILABILITY_CACHE_KEY, False, AVAILABILITY_CACHE_TIMEOUT)
             return None
         except requests.exceptions.Timeout:
             logger.error("Ollama request timed out")
@@ -91,18 +106,96 @@ class OllamaService:
             logger.error(f"Unexpected error in Ollama service: {e}")
             return None
     
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> Iterator[str]:
+        """
+        Generate a response from Ollama, yielding text chunks as they arrive.
+        
+        Args:
+            prompt: The user prompt/message
+            system_prompt: Optional system instructions
+            temperature: Creativity level (0.0 - 1.0)
+            max_tokens: Maximum response length
+            
+        Yields:
+            Response text chunks; stops early (without raising) if the request fails
+        """
+        try:
+            # Build the full prompt with system context
+            full_prompt = prompt
+            if system_prompt:
+                full_prompt = f"{system_prompt}\n\n{prompt}"
+            
+            payload = {
+                "model": self.model,
+                "prompt": full_prompt,
+                "stream": True,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens,
+                }
+            }
+            
+            url = f"{self.base_url}/api/generate"
+            logger.info(f"Sending streaming request to Ollama: {url}")
+            
+            with self.session.post(
+                url,
+                json=payload,
+                stream=True,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                cache.set(AVAILABILITY_CACHE_KEY, True, AVAILABILITY_CACHE_TIMEOUT)
+                
+                # Ollama streams one JSON object per line
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    text = chunk.get('response', '')
+                    if text:
+                        yield text
+                    if chunk.get('done'):
+                        break
+                
+        except requests.exceptions.ConnectionError:
+            logger.error("Failed to connect to Ollama server. Is it running?")
+            cache.set(AVAILABILITY_CACHE_KEY, False, AVAILABILITY_CACHE_TIMEOUT)
+        except requests.exceptions.Timeout:
+            logger.error("Ollama streaming request timed out")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Ollama streaming request failed: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error in Ollama streaming: {e}")
+    
     def is_available(self) -> bool:
         """
         Check if Ollama server is available.
+        
+        The probe result is cached for AVAILABILITY_CACHE_TIMEOUT seconds so
+        status polling doesn't hit the Ollama server on every request.
         """
+        available = cache.get(AVAILABILITY_CACHE_KEY)
+        if available is not None:
+            return available
+        
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/tags",
                 timeout=5
             )
-            return response.status_code == 200
+            available = response.status_code == 200
         except Exception:
-            return False
+            available = False
+        
+        cache.set(AVAILABILITY_CACHE_KEY, available, AVAILABILITY_CACHE_TIMEOUT)
+        return available
 
 
 # Global service instance
@@ -0,0 +1,122 @@
+"""
+Background reply tasks for the AI Travel Assistant.
+
+Runs slow assistant replies (Ollama generation plus saving the exchange) on
+a small worker pool so the chat request can return right away. Task state
+lives in the cache, where the task status endpoint reads it, so background
+replies need a cache shared by every server process.
+"""
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from config.cache import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+# Replies generated concurrently; bounded by what the Ollama server can serve
+REPLY_TASK_WORKERS = getattr(settings, 'ASSISTANT_REPLY_TASK_WORKERS', 4)
+
+# Tasks allowed to wait for a free worker before new ones are turned away
+REPLY_TASK_QUEUE_SIZE = getattr(settings, 'ASSISTANT_REPLY_TASK_QUEUE_SIZE', 16)
+
+# How long task state stays readable after its last update (seconds)
+REPLY_TASK_CACHE_TIMEOUT = 600
+
+TASK_PENDING = 'pending'
+TASK_DONE = 'done'
+TASK_FAILED = 'failed'
+
+_executor = ThreadPoolExecutor(
+    max_workers=REPLY_TASK_WORKERS,
+    thread_name_prefix='assistant-reply'
+)
+
+# One slot per running or queued task
+_task_slots = threading.BoundedSemaphore(REPLY_TASK_WORKERS + REPLY_TASK_QUEUE_SIZE)
+
+
+class ReplyTaskQueueFull(Exception):
+    """Raised when every worker is busy and the task queue is full."""
+
+
+def reply_tasks_available() -> bool:
+    """
+    Whether background replies can be served by this deployment.
+    
+    Task state written by one process must be readable by whichever process
+    handles the poll, so per-process cache backends are not enough.
+    """
+    return cache_is_shared()
+
+
+def reply_task_cache_key(task_id: str) -> str:
+    """Cache key for a background reply task's state."""
+    return f"assistant_reply_task_{task_id}"
+
+
+def _run_reply_task(task_id: str, state: dict, func: Callable, args: tuple) -> None:
+    """Run a reply task in a worker thread and record its outcome."""
+    try:
+        # Restart the expiry clock so time spent queued does not count
+        cache.set(reply_task_cache_key(task_id), state, REPLY_TASK_CACHE_TIMEOUT)
+        state = {**state, 'status': TASK_DONE, 'result': func(*args)}
+    except Exception:
+        logger.exception(f"Assistant reply task {task_id} failed")
+        state = {**state, 'status': TASK_FAILED}
+    finally:
+        connections.close_all()
+        _task_slots.release()
+    cache.set(reply_task_cache_key(task_id), state, REPLY_TASK_CACHE_TIMEOUT)
+
+
+def submit_reply_task(user_id: int, conversation_id: int, func: Callable, *args, on_accept: Optional[Callable] = None) -> str:
+    """
+    Queue a reply to be generated in the background.
+
+    Args:
+        user_id: Owner of the task; only they can read its state
+        conversation_id: Conversation the reply belongs to
+        func: Callable producing the reply payload dict
+        *args: Arguments passed to func
+        on_accept: Optional callable run once the task has a queue slot,
+            before it is queued; used to persist the user's message
+
+    Returns:
+        Task ID for polling with get_reply_task()
+    
+    Raises:
+        ReplyTaskQueueFull: If the queue has no room for another task
+    """
+    if not _task_slots.acquire(blocking=False):
+        raise ReplyTaskQueueFull()
+    if on_accept is not None:
+        try:
+            on_accept()
+        except Exception:
+            _task_slots.release()
+            raise
+    
+    task_id = uuid.uuid4().hex
+    state = {
+        'status': TASK_PENDING,
+        'user_id': user_id,
+        'conversation_id': conversation_id,
+    }
+    cache.set(reply_task_cache_key(task_id), state, REPLY_TASK_CACHE_TIMEOUT)
+    _executor.submit(_run_reply_task, task_id, state, func, args)
+    return task_id
+
+
+def get_reply_task(task_id: str, user_id: int) -> Optional[dict]:
+    """Return a task's state, or None if it is unknown, expired or owned by another user."""
+    state = cache.get(reply_task_cache_key(task_id))
+    if state is None or state['user_id'] != user_id:
+        return None
+    return state
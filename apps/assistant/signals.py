@@ -0,0 +1,99 @@
+"""
+Signals for assistant context cache invalidation.
+
+Drops a user's cached assistant context whenever data it summarizes changes.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.buddies.models import BuddyRequest
+from apps.preferences.models import Preference
+from apps.recommendations.models import TripSavedDestination
+from apps.store.models import Order, OrderItem, Cart, CartItem, Wishlist
+from apps.trips.models import Trip, TripMember
+
+from .services.context_builder import invalidate_user_context
+
+User = get_user_model()
+
+
+def _invalidate_trip_users(trip_id):
+    """Invalidate context for a trip's creator and all of its members."""
+    user_ids = set(TripMember.objects.filter(trip_id=trip_id).values_list('user_id', flat=True))
+    user_ids.update(Trip.objects.filter(pk=trip_id).values_list('creator_id', flat=True))
+    invalidate_user_context(*user_ids)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_context_on_user_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Preference)
+def invalidate_context_on_preference_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Preference.interests.through)
+def invalidate_context_on_interests_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_context(instance.user_id)
+    elif pk_set:
+        invalidate_user_context(
+            *Preference.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Trip)
+def invalidate_context_on_trip_save(sender, instance, **kwargs):
+    _invalidate_trip_users(instance.pk)
+
+
+@receiver(post_delete, sender=Trip)
+def invalidate_context_on_trip_delete(sender, instance, **kwargs):
+    # Members are already gone by the time the trip row is deleted
+    invalidate_user_context(instance.creator_id)
+
+
+@receiver([post_save, post_delete], sender=TripMember)
+def invalidate_context_on_member_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id)
+    _invalidate_trip_users(instance.trip_id)
+
+
+@receiver([post_save, post_delete], sender=TripSavedDestination)
+def invalidate_context_on_saved_destination_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.saved_by_id)
+
+
+@receiver([post_save, post_delete], sender=BuddyRequest)
+def invalidate_context_on_buddy_request_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.sender_id, instance.receiver_id)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def invalidate_context_on_order_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def invalidate_context_on_order_item_change(sender, instance, **kwargs):
+    invalidate_user_context(
+        *Order.objects.filter(pk=instance.order_id).values_list('user_id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def invalidate_context_on_cart_item_change(sender, instance, **kwargs):
+    invalidate_user_context(
+        *Cart.objects.filter(pk=instance.cart_id).values_list('user_id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Wishlist)
+def invalidate_context_on_wishlist_change(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id)
@@ -0,0 +1,115 @@
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from .models import ChatbotMessage
+from .services import reply_tasks
+
+
+async def _read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+
+class AssistantChatStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', password='pw', full_name='Me')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _post_stream(self):
+        return self.client.post(
+            '/api/assistant/chat/',
+            {'message': 'hello', 'stream': True},
+            format='json'
+        )
+
+    @mock.patch('apps.assistant.views.ollama_service.generate_stream')
+    def test_stream_response_is_async(self, generate_stream):
+        generate_stream.return_value = (delta for delta in ['Hel', 'lo'])
+        response = self._post_stream()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = async_to_sync(_read_stream)(response)
+        self.assertIn('"delta": "Hel"', body)
+        self.assertIn('"done": true', body)
+        self.assertEqual(
+            list(ChatbotMessage.objects.order_by('id').values_list('role', 'content')),
+            [(ChatbotMessage.Role.USER, 'hello'), (ChatbotMessage.Role.ASSISTANT, 'Hello')]
+        )
+
+    @mock.patch('apps.assistant.views.ollama_service.generate_stream')
+    def test_user_message_saved_before_stream_is_read(self, generate_stream):
+        generate_stream.return_value = (delta for delta in ['Hi'])
+        self._post_stream()
+        # The client never reads the stream, as after a disconnect
+        self.assertEqual(
+            list(ChatbotMessage.objects.values_list('role', 'content')),
+            [(ChatbotMessage.Role.USER, 'hello')]
+        )
+
+
+class _InlineExecutor:
+    """Runs submitted tasks immediately, in the calling thread."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(),
+}})
+class AssistantChatBackgroundTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', password='pw', full_name='Me')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _post_background(self):
+        return self.client.post(
+            '/api/assistant/chat/',
+            {'message': 'hello', 'background': True},
+            format='json'
+        )
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_refused_without_shared_cache(self):
+        response = self._post_background()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(ChatbotMessage.objects.exists())
+
+    @mock.patch.object(reply_tasks, '_task_slots', threading.BoundedSemaphore(1))
+    def test_full_queue_returns_503(self):
+        reply_tasks._task_slots.acquire()
+        response = self._post_background()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(ChatbotMessage.objects.exists())
+
+    @mock.patch.object(reply_tasks, '_executor', _InlineExecutor())
+    @mock.patch('apps.assistant.views.ollama_service.generate', side_effect=RuntimeError)
+    def test_user_message_saved_when_task_fails(self, generate):
+        with self.assertLogs(reply_tasks.logger, 'ERROR'):
+            response = self._post_background()
+        self.assertEqual(response.status_code, 202)
+        task = self.client.get(f"/api/assistant/chat/tasks/{response.data['task_id']}/")
+        self.assertEqual(task.data['status'], reply_tasks.TASK_FAILED)
+        self.assertEqual(
+            list(ChatbotMessage.objects.values_list('role', 'content')),
+            [(ChatbotMessage.Role.USER, 'hello')]
+        )
+
+    @mock.patch.object(reply_tasks, '_executor', _InlineExecutor())
+    @mock.patch('apps.assistant.views.ollama_service.generate', return_value='Hi there')
+    def test_reply_saved_after_user_message(self, generate):
+        response = self._post_background()
+        task = self.client.get(f"/api/assistant/chat/tasks/{response.data['task_id']}/")
+        self.assertEqual(task.data['status'], reply_tasks.TASK_DONE)
+        self.assertEqual(
+            list(ChatbotMessage.objects.order_by('id').values_list('role', 'content')),
+            [(ChatbotMessage.Role.USER, 'hello'), (ChatbotMessage.Role.ASSISTANT, 'Hi there')]
+        )
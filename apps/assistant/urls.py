@@ -5,6 +5,7 @@ AI Travel Assistant URLs.
 from django.urls import path
 from .views import (
     AssistantChatView,
+    AssistantChatTaskView,
     AssistantConversationsView,
     AssistantConversationDetailView,
     AssistantStatusView,
@@ -14,6 +15,7 @@ app_name = 'assistant'
 
 urlpatterns = [
     path('chat/', AssistantChatView.as_view(), name='chat'),
+    path('chat/tasks/<str:task_id>/', AssistantChatTaskView.as_view(), name='chat-task'),
     path('status/', AssistantStatusView.as_view(), name='status'),
     path('conversations/', AssistantConversationsView.as_view(), name='conversations'),
     path('conversations/<int:conversation_id>/', AssistantConversationDetailView.as_view(), name='conversation-detail'),
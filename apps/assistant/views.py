@@ -2,7 +2,14 @@
 AI Travel Assistant Views.
 """
 
+import json
 import logging
+from functools import partial
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Count, OuterRef, Subquery
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -13,20 +20,33 @@ from .serializers import (
     AssistantChatRequestSerializer,
     AssistantChatResponseSerializer,
     ChatbotConversationSerializer,
+    ChatbotConversationListSerializer,
     ChatbotMessageSerializer,
 )
 from .services.ollama_service import ollama_service
-from .services.context_builder import build_full_prompt
+from .services.context_builder import (
+    build_full_prompt,
+    history_entry,
+    append_recent_messages,
+)
 from .services.buddy_suggestions import (
-    is_buddy_request,
-    is_more_buddies_request,
     build_buddy_response,
+    BUDDY_PAGINATION_FIELDS,
 )
-from .services.intent_detector import detect_intent, is_context_sufficient
+from .services.intent_detector import classify_message, detect_intent, is_context_sufficient
 from .services.hallucination_guard import validate_response
+from .services.reply_tasks import (
+    submit_reply_task,
+    get_reply_task,
+    reply_tasks_available,
+    ReplyTaskQueueFull,
+    TASK_PENDING,
+    TASK_DONE,
+)
 
 logger = logging.getLogger(__name__)
 
+
 # Responses for insufficient database context
 NO_DATA_RESPONSES = {
     'trips': "I don't see any trips in your account yet. Once you create trips, I can help you with planning and recommendations!",
@@ -48,21 +68,199 @@ FALLBACK_RESPONSES = {
     'default': "Hello! I'm your Travel Buddy AI assistant. I can help you with:\n\n• 🗺️ **Trip Planning** - Create personalized itineraries\n• 👥 **Finding Buddies** - Match with compatible travelers\n• 📍 **Destinations** - Discover new places to explore\n• ⚡ **Optimization** - Make the most of your trips\n\nWhat would you like help with today?"
 }
 
+# Messages returned per page by the conversation detail endpoint
+MESSAGES_PAGE_SIZE = 50
+
+# How long the latest page of a conversation is cached (seconds)
+CONVERSATION_CACHE_TIMEOUT = 30
+
+
+def conversation_cache_key(conversation_id, user_id) -> str:
+    """Cache key for the latest page of a user's conversation."""
+    return f"assistant_conversation_{conversation_id}_{user_id}"
+
+
+def _save_exchange(conversation, user_message: str, reply: str, update_fields=None):
+    """
+    Persist a user message and the assistant reply in one INSERT.
+    
+    Also appends both to the conversation's recent message buffer and saves
+    it, plus any given conversation fields, in the same transaction.
+    Returns the saved assistant message.
+    """
+    append_recent_messages(
+        conversation,
+        history_entry(ChatbotMessage.Role.USER, user_message),
+        history_entry(ChatbotMessage.Role.ASSISTANT, reply),
+    )
+    with transaction.atomic():
+        user_msg, assistant_msg = ChatbotMessage.objects.bulk_create([
+            ChatbotMessage(
+                conversation=conversation,
+                role=ChatbotMessage.Role.USER,
+                content=user_message
+            ),
+            ChatbotMessage(
+                conversation=conversation,
+                role=ChatbotMessage.Role.ASSISTANT,
+                content=reply
+            ),
+        ])
+        conversation.save(update_fields=['recent_messages'] + list(update_fields or []))
+    cache.delete(conversation_cache_key(conversation.id, conversation.user_id))
+    return assistant_msg
+
 
-def get_fallback_response(message: str) -> str:
-    """Get an appropriate fallback response based on the message content."""
-    message_lower = message.lower()
+def _save_user_message(conversation, user_message: str, update_fields=None):
+    """
+    Persist the user's message ahead of a reply that is produced later.
+    
+    Used when the reply is streamed or generated in the background, so the
+    user's turn is kept even if the reply never completes. Also appends it
+    to the recent message buffer and saves that plus any given
+    conversation fields.
+    """
+    append_recent_messages(
+        conversation,
+        history_entry(ChatbotMessage.Role.USER, user_message),
+    )
+    with transaction.atomic():
+        ChatbotMessage.objects.create(
+            conversation=conversation,
+            role=ChatbotMessage.Role.USER,
+            content=user_message
+        )
+        conversation.save(update_fields=['recent_messages'] + list(update_fields or []))
+    cache.delete(conversation_cache_key(conversation.id, conversation.user_id))
+
+
+def _save_reply(conversation, reply: str):
+    """
+    Persist an assistant reply to a user message saved by _save_user_message.
+    
+    Returns the saved assistant message.
+    """
+    append_recent_messages(
+        conversation,
+        history_entry(ChatbotMessage.Role.ASSISTANT, reply),
+    )
+    with transaction.atomic():
+        assistant_msg = ChatbotMessage.objects.create(
+            conversation=conversation,
+            role=ChatbotMessage.Role.ASSISTANT,
+            content=reply
+        )
+        conversation.save(update_fields=['recent_messages'])
+    cache.delete(conversation_cache_key(conversation.id, conversation.user_id))
+    return assistant_msg
+
+
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a server-sent event."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def stream_assistant_reply(conversation, message_kind: str, full_prompt: str, system_prompt: str):
+    """
+    Stream an Ollama reply as server-sent events and persist it once complete.
+    
+    The caller saves the user's message before streaming starts. This is an
+    async generator so ASGI servers flush each event as it is produced;
+    every blocking read from Ollama runs in a worker thread.
+    
+    Emits `{"delta": ...}` events while tokens arrive and a final
+    `{"done": true, ...}` event with the saved message details. Falls back to
+    the canned response if Ollama produced nothing.
+    """
+    deltas = ollama_service.generate_stream(
+        prompt=full_prompt,
+        system_prompt=system_prompt,
+        temperature=0.7
+    )
+    next_delta = sync_to_async(next, thread_sensitive=False)
+    
+    chunks = []
+    try:
+        while (delta := await next_delta(deltas, None)) is not None:
+            chunks.append(delta)
+            yield _sse_event({'delta': delta})
+    finally:
+        # Release the Ollama connection if the client went away mid-stream.
+        # A read still running in its worker thread makes close() raise;
+        # the generator is then closed when it is garbage collected.
+        try:
+            await sync_to_async(deltas.close, thread_sensitive=False)()
+        except ValueError:
+            pass
+    
+    ai_response = ''.join(chunks).strip()
+    if not ai_response:
+        logger.warning("Ollama unavailable, using fallback response")
+        ai_response = get_fallback_response(message_kind)
+        yield _sse_event({'delta': ai_response})
+    
+    assistant_msg = await sync_to_async(_save_reply)(conversation, ai_response)
+    yield _sse_event({
+        'done': True,
+        'reply': ai_response,
+        'conversation_id': conversation.id,
+        'message_id': assistant_msg.id
+    })
+
+
+def generate_assistant_reply(conversation, user_message: str, message_kind: str, intent_type: str, intent_category: str, full_prompt: str, system_prompt: str, structured_context: dict, update_fields, user_message_saved: bool = False) -> dict:
+    """
+    Generate an Ollama reply (or fallback), guard it and persist the exchange.
+    
+    Runs either inline in the chat request or as a background reply task.
+    Background tasks save the user's message up front and pass
+    user_message_saved, so only the reply is persisted here.
+    Returns the chat response payload.
+    """
+    # Regular message - use Ollama or fallback
+    # Generate AI response (generate() returns None when Ollama is unreachable)
+    ai_response = ollama_service.generate(
+        prompt=full_prompt,
+        system_prompt=system_prompt,
+        temperature=0.7
+    )
+    
+    # Use fallback if Ollama fails
+    if not ai_response:
+        logger.warning("Ollama unavailable, using fallback response")
+        ai_response = get_fallback_response(message_kind)
+    
+    # HALLUCINATION GUARD:
+    # Validate the response for database queries
+    if intent_type == 'database_query' and ai_response:
+        is_valid, override_response = validate_response(
+            response=ai_response,
+            user_context=structured_context,
+            intent_category=intent_category
+        )
+        
+        if not is_valid and override_response:
+            logger.warning(f"Hallucination detected, using override response")
+            ai_response = override_response
     
-    if any(word in message_lower for word in ['plan', 'planning', 'create trip', 'new trip']):
-        return FALLBACK_RESPONSES['plan']
-    elif any(word in message_lower for word in ['buddy', 'buddies', 'friend', 'partner', 'companion']):
-        return FALLBACK_RESPONSES['buddy']
-    elif any(word in message_lower for word in ['itinerary', 'optimize', 'schedule', 'order']):
-        return FALLBACK_RESPONSES['itinerary']
-    elif any(word in message_lower for word in ['destination', 'recommend', 'suggest', 'where', 'place']):
-        return FALLBACK_RESPONSES['destination']
+    if user_message_saved:
+        assistant_msg = _save_reply(conversation, ai_response)
     else:
-        return FALLBACK_RESPONSES['default']
+        # Save both messages and update conversation timestamp
+        assistant_msg = _save_exchange(
+            conversation, user_message, ai_response, update_fields
+        )
+    
+    return {
+        'reply': ai_response,
+        'conversation_id': conversation.id,
+        'message_id': assistant_msg.id
+    }
+
+
+def get_fallback_response(message_kind: str) -> str:
+    """Get an appropriate fallback response for a message kind from classify_message."""
+    return FALLBACK_RESPONSES.get(message_kind, FALLBACK_RESPONSES['default'])
 
 
 class AssistantChatView(APIView):
@@ -71,6 +269,14 @@ class AssistantChatView(APIView):
     
     Send a message to the AI travel assistant and receive a response.
     Maintains conversation history for context-aware responses.
+    
+    With `"stream": true`, general replies are returned as server-sent
+    events instead of a single JSON body. With `"background": true`, they
+    are generated off the request thread: the response is 202 with a
+    `task_id` to poll at /api/assistant/chat/tasks/<task_id>/, or 503 when
+    the task queue is full. Background replies need a cache shared by every
+    server process (e.g. Redis, see CACHES in settings); with the default
+    LocMem cache they are always refused with 503.
     """
     permission_classes = [IsAuthenticated]
 
@@ -81,6 +287,15 @@ class AssistantChatView(APIView):
         
         user_message = serializer.validated_data['message']
         conversation_id = serializer.validated_data.get('conversation_id')
+        stream_reply = serializer.validated_data.get('stream', False)
+        background_reply = serializer.validated_data.get('background', False)
+        
+        # Task state must be visible to whichever process serves the poll
+        if background_reply and not reply_tasks_available():
+            return Response(
+                {'detail': 'Background replies are not available'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         
         # Get or create conversation
         conversation = None
@@ -93,6 +308,7 @@ class AssistantChatView(APIView):
             except ChatbotConversation.DoesNotExist:
                 pass
         
+        conversation_created = False
         if not conversation:
             # Create new conversation with title from first message
             title = user_message[:100] + "..." if len(user_message) > 100 else user_message
@@ -100,36 +316,31 @@ class AssistantChatView(APIView):
                 user=request.user,
                 title=title
             )
+            conversation_created = True
         
-        # Save user message
-        user_msg = ChatbotMessage.objects.create(
-            conversation=conversation,
-            role=ChatbotMessage.Role.USER,
-            content=user_message
-        )
+        # Only bump the timestamp of an existing conversation
+        timestamp_fields = [] if conversation_created else ['updated_at']
         
-        # Check if this is a buddy suggestion request
-        buddy_request = is_buddy_request(user_message)
-        more_buddies_request = is_more_buddies_request(user_message)
+        # Classify once: buddy suggestion request, or fallback category
+        message_kind = classify_message(user_message)
         
-        if buddy_request or more_buddies_request:
+        if message_kind in ('buddy_request', 'more_buddies'):
             # Handle buddy suggestions - bypass Ollama
             buddy_response = build_buddy_response(
                 user=request.user,
                 conversation=conversation,
-                is_more_request=more_buddies_request
+                is_more_request=message_kind == 'more_buddies'
             )
             
-            # Save assistant response (text only for history)
-            assistant_msg = ChatbotMessage.objects.create(
-                conversation=conversation,
-                role=ChatbotMessage.Role.ASSISTANT,
-                content=buddy_response['reply_text']
+            # Save both messages (text only for history) along with
+            # pagination state and the timestamp
+            assistant_msg = _save_exchange(
+                conversation,
+                user_message,
+                buddy_response['reply_text'],
+                update_fields=BUDDY_PAGINATION_FIELDS + ['updated_at']
             )
             
-            # Update conversation timestamp
-            conversation.save()
-            
             return Response({
                 'reply': buddy_response['reply_text'],
                 'buddy_cards': buddy_response['buddy_cards'],
@@ -161,90 +372,116 @@ class AssistantChatView(APIView):
                 
                 logger.info(f"Insufficient context for {intent_category} query, returning refusal")
                 
-                # Save assistant response
-                assistant_msg = ChatbotMessage.objects.create(
-                    conversation=conversation,
-                    role=ChatbotMessage.Role.ASSISTANT,
-                    content=refusal_message
+                # Save both messages and update conversation timestamp
+                assistant_msg = _save_exchange(
+                    conversation, user_message, refusal_message, timestamp_fields
                 )
                 
-                # Update conversation timestamp
-                conversation.save()
-                
                 return Response({
                     'reply': refusal_message,
                     'conversation_id': conversation.id,
                     'message_id': assistant_msg.id
                 }, status=status.HTTP_200_OK)
         
-        # Regular message - use Ollama or fallback
-        # Generate AI response
-        ai_response = None
-        if ollama_service.is_available():
-            ai_response = ollama_service.generate(
-                prompt=full_prompt,
-                system_prompt=system_prompt,
-                temperature=0.7
+        # Stream tokens as they arrive when asked to; database queries are
+        # excluded because the hallucination guard needs the full response
+        if stream_reply and intent_type != 'database_query':
+            # Keep the user's turn even if the client disconnects mid-stream
+            _save_user_message(conversation, user_message, timestamp_fields)
+            response = StreamingHttpResponse(
+                stream_assistant_reply(
+                    conversation, message_kind, full_prompt, system_prompt
+                ),
+                content_type='text/event-stream'
             )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
         
-        # Use fallback if Ollama fails
-        if not ai_response:
-            logger.warning("Ollama unavailable, using fallback response")
-            ai_response = get_fallback_response(user_message)
-        
-        # HALLUCINATION GUARD:
-        # Validate the response for database queries
-        if intent_type == 'database_query' and ai_response:
-            is_valid, override_response = validate_response(
-                response=ai_response,
-                user_context=structured_context,
-                intent_category=intent_category
-            )
-            
-            if not is_valid and override_response:
-                logger.warning(f"Hallucination detected, using override response")
-                ai_response = override_response
+        # Hand slow generations to the reply worker pool when asked to;
+        # the client polls the task endpoint for the result
+        if background_reply:
+            try:
+                # The user's turn is kept even if generation fails
+                task_id = submit_reply_task(
+                    request.user.id, conversation.id,
+                    partial(
+                        generate_assistant_reply,
+                        conversation, user_message, message_kind, intent_type, intent_category,
+                        full_prompt, system_prompt, structured_context,
+                        update_fields=None,
+                        user_message_saved=True
+                    ),
+                    on_accept=lambda: _save_user_message(conversation, user_message, timestamp_fields)
+                )
+            except ReplyTaskQueueFull:
+                return Response(
+                    {'detail': 'Too many replies in progress, please try again shortly'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            return Response({
+                'task_id': task_id,
+                'status': TASK_PENDING,
+                'conversation_id': conversation.id
+            }, status=status.HTTP_202_ACCEPTED)
         
-        # Save assistant response
-        assistant_msg = ChatbotMessage.objects.create(
-            conversation=conversation,
-            role=ChatbotMessage.Role.ASSISTANT,
-            content=ai_response
+        return Response(
+            generate_assistant_reply(
+                conversation, user_message, message_kind, intent_type, intent_category,
+                full_prompt, system_prompt, structured_context, timestamp_fields
+            ),
+            status=status.HTTP_200_OK
         )
+
+
+class AssistantChatTaskView(APIView):
+    """
+    GET /api/assistant/chat/tasks/<task_id>/
+    
+    Poll a background chat reply. Once done, the response also carries the
+    reply, conversation ID and message ID.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        task = get_reply_task(task_id, request.user.id)
+        if task is None:
+            return Response(
+                {'detail': 'Task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        # Update conversation timestamp
-        conversation.save()  # Triggers updated_at
-        
-        return Response({
-            'reply': ai_response,
-            'conversation_id': conversation.id,
-            'message_id': assistant_msg.id
-        }, status=status.HTTP_200_OK)
-        
-        # Update conversation timestamp
-        conversation.save()  # Triggers updated_at
-        
-        return Response({
-            'reply': ai_response,
-            'conversation_id': conversation.id,
-            'message_id': assistant_msg.id
-        }, status=status.HTTP_200_OK)
+        data = {
+            'task_id': task_id,
+            'status': task['status'],
+            'conversation_id': task['conversation_id']
+        }
+        if task['status'] == TASK_DONE:
+            data.update(task['result'])
+        return Response(data)
 
 
 class AssistantConversationsView(APIView):
     """
     GET /api/assistant/conversations/
     
-    List user's conversation history.
+    List user's conversation history with message counts and the latest
+    message; full messages come from the detail endpoint.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        last_message = ChatbotMessage.objects.filter(
+            conversation=OuterRef('pk')
+        ).order_by('-created_at', '-id').values('content')[:1]
         conversations = ChatbotConversation.objects.filter(
             user=request.user
-        ).prefetch_related('messages')[:20]
+        ).defer('recent_messages').annotate(
+            _message_count=Count('messages'),
+            _last_message=Subquery(last_message)
+        ).order_by('-updated_at')[:20]
         
-        serializer = ChatbotConversationSerializer(conversations, many=True)
+        serializer = ChatbotConversationListSerializer(conversations, many=True)
         return Response({
             'count': len(conversations),
             'conversations': serializer.data
@@ -257,13 +494,34 @@ class AssistantConversationDetailView(APIView):
     DELETE /api/assistant/conversations/<id>/
     
     Get or delete a specific conversation.
+    
+    GET returns the latest page of messages (oldest first); pass
+    `?before=<message_id>` to page further back.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, conversation_id):
+        before = request.query_params.get('before')
+        if before is not None:
+            try:
+                before = int(before)
+            except ValueError:
+                return Response(
+                    {'detail': 'before must be a message ID'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # The latest page is what re-opening a conversation loads; serve it
+        # from cache until the next message is saved
+        cache_key = conversation_cache_key(conversation_id, request.user.id)
+        if before is None:
+            data = cache.get(cache_key)
+            if data is not None:
+                return Response(data)
+        
         try:
-            conversation = ChatbotConversation.objects.prefetch_related(
-                'messages'
+            conversation = ChatbotConversation.objects.defer('recent_messages').annotate(
+                _message_count=Count('messages')
             ).get(id=conversation_id, user=request.user)
         except ChatbotConversation.DoesNotExist:
             return Response(
@@ -271,8 +529,25 @@ class AssistantConversationDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = ChatbotConversationSerializer(conversation)
-        return Response(serializer.data)
+        messages = ChatbotMessage.objects.filter(
+            conversation=conversation
+        ).only('id', 'role', 'content', 'created_at').order_by('-id')
+        if before is not None:
+            messages = messages.filter(id__lt=before)
+        
+        # Fetch one extra row to know whether older messages remain
+        page = list(messages[:MESSAGES_PAGE_SIZE + 1])
+        has_more = len(page) > MESSAGES_PAGE_SIZE
+        page = page[:MESSAGES_PAGE_SIZE][::-1]
+        
+        data = ChatbotConversationSerializer(conversation).data
+        data['messages'] = ChatbotMessageSerializer(page, many=True).data
+        data['has_more_messages'] = has_more
+        data['next_before'] = page[0].id if has_more else None
+        
+        if before is None:
+            cache.set(cache_key, data, CONVERSATION_CACHE_TIMEOUT)
+        return Response(data)
 
     def delete(self, request, conversation_id):
         try:
@@ -287,6 +562,7 @@ class AssistantConversationDetailView(APIView):
             )
         
         conversation.delete()
+        cache.delete(conversation_cache_key(conversation_id, request.user.id))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -3,6 +3,7 @@ Buddies app admin configuration.
 """
 
 from django.contrib import admin
+from .admin_paginators import EstimateCountPaginator
 from .models import BuddyMatch, BuddyRequest
 
 
@@ -19,6 +20,10 @@ class BuddyMatchAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at',
     ]
+    list_select_related = ['user', 'matched_user']
+    # Skip the second, unfiltered COUNT(*) behind "N results (M total)"
+    show_full_result_count = False
+    paginator = EstimateCountPaginator
     list_filter = [
         'created_at',
         'updated_at',
@@ -31,6 +36,14 @@ class BuddyMatchAdmin(admin.ModelAdmin):
     ]
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-match_score', '-created_at']
+
+    def get_queryset(self, request):
+        # Load only the columns the changelist and change form show
+        return super().get_queryset(request).select_related('user', 'matched_user').only(
+            'id', 'match_score', 'created_at', 'updated_at',
+            'user__email', 'user__full_name',
+            'matched_user__email', 'matched_user__full_name',
+        )
     
     fieldsets = (
         ('Match Information', {
@@ -56,6 +69,10 @@ class BuddyRequestAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at',
     ]
+    list_select_related = ['sender', 'receiver']
+    # Skip the second, unfiltered COUNT(*) behind "N results (M total)"
+    show_full_result_count = False
+    paginator = EstimateCountPaginator
     list_filter = [
         'status',
         'created_at',
@@ -70,6 +87,14 @@ class BuddyRequestAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
     list_editable = ['status']
+
+    def get_queryset(self, request):
+        # Load only the columns the changelist and change form show
+        return super().get_queryset(request).select_related('sender', 'receiver').only(
+            'id', 'status', 'created_at', 'updated_at',
+            'sender__email', 'sender__full_name',
+            'receiver__email', 'receiver__full_name',
+        )
     
     fieldsets = (
         ('Request Information', {
@@ -0,0 +1,40 @@
+"""
+Buddies app admin paginators.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this many estimated rows an exact COUNT(*) is cheap, so use it
+ESTIMATE_COUNT_THRESHOLD = 10000
+
+
+class EstimateCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of an unfiltered changelist from
+    PostgreSQL's planner statistics instead of running COUNT(*).
+
+    Filtered or searched querysets, small tables, tables without
+    statistics yet and non-PostgreSQL databases fall back to an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql' or query.where:
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [query.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        estimate = row[0] if row else -1
+        if estimate < ESTIMATE_COUNT_THRESHOLD:
+            return super().count
+        return estimate
@@ -9,3 +9,7 @@ class BuddiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.buddies'
     verbose_name = 'Buddy Matching'
+
+    def ready(self):
+        # Import signals when app is ready
+        import apps.buddies.signals  # noqa: F401
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buddies', '0002_buddymatch_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buddyrequest',
+            index=models.Index(fields=['receiver', 'sender'], name='buddies_bud_receive_013f5c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buddyrequest',
+            index=models.Index(fields=['receiver', 'status'], name='buddies_bud_receive_3f970d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 06:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buddies', '0003_buddyrequest_buddies_bud_receive_013f5c_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buddymatch',
+            index=models.Index(fields=['user', '-match_score', '-created_at'], name='buddies_bud_user_id_a60eb4_idx'),
+        ),
+    ]
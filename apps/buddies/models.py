@@ -54,10 +54,29 @@ class BuddyMatch(models.Model):
         verbose_name_plural = _('Buddy Matches')
         unique_together = ('user', 'matched_user')
         ordering = ['-match_score', '-created_at']
+        indexes = [
+            # A user's matches in default ordering, read straight off the index
+            models.Index(fields=['user', '-match_score', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} → {self.matched_user.email} ({self.match_score:.1f}%)"
 
+    @classmethod
+    def create_pair(cls, user, other_user, match_score):
+        """
+        Create the symmetric matches between two users in one INSERT.
+        
+        A match that already exists in either direction is left untouched.
+        """
+        return cls.objects.bulk_create(
+            [
+                cls(user=user, matched_user=other_user, match_score=match_score),
+                cls(user=other_user, matched_user=user, match_score=match_score),
+            ],
+            ignore_conflicts=True
+        )
+
 
 class BuddyRequest(models.Model):
     """
@@ -98,6 +117,13 @@ class BuddyRequest(models.Model):
         verbose_name_plural = _('Buddy Requests')
         unique_together = ('sender', 'receiver')
         ordering = ['-created_at']
+        indexes = [
+            # Reverse direction of the unique (sender, receiver) index, so
+            # either side of a two-way pair lookup is an index seek
+            models.Index(fields=['receiver', 'sender']),
+            # Incoming requests for a user, filtered by status
+            models.Index(fields=['receiver', 'status']),
+        ]
 
     def __str__(self):
         return f"{self.sender.email} → {self.receiver.email} ({self.status})"
@@ -6,9 +6,9 @@ This module defines serializers for buddy matching and buddy requests.
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.contrib.auth import get_user_model
 from django.db import models
-from .models import BuddyRequest
+from .models import BuddyMatch, BuddyRequest
+from .services import get_buddy_relation_maps
 
 User = get_user_model()
 
@@ -23,6 +23,74 @@ class MatchedUserSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+def _between_q(user1_id, user2_id):
+    """Q matching a BuddyRequest between two users in either direction."""
+    return (
+        models.Q(sender_id=user1_id, receiver_id=user2_id) |
+        models.Q(sender_id=user2_id, receiver_id=user1_id)
+    )
+
+
+def get_request_status(user, buddy_match, buddy_req):
+    """
+    Status of the buddy relationship between a user and a matched user.
+    
+    Args:
+        user: The authenticated user
+        buddy_match: BuddyMatch between the two users, or None
+        buddy_req: BuddyRequest between the two users, or None
+        
+    Returns:
+        One of 'none', 'pending_outgoing', 'pending_incoming', 'accepted', 'rejected'
+    """
+    # If they have a connected match, return 'accepted'
+    if buddy_match and buddy_match.status == BuddyMatch.Status.CONNECTED:
+        return 'accepted'
+    
+    # If they were disconnected, treat as if no connection exists
+    if not buddy_req:
+        return 'none'
+        
+    if buddy_req.status == BuddyRequest.Status.ACCEPTED:
+        # They accepted but might have disconnected
+        if buddy_match and buddy_match.status == BuddyMatch.Status.DISCONNECTED:
+            return 'none'
+        return 'accepted'
+    if buddy_req.status == BuddyRequest.Status.REJECTED:
+        return 'rejected'
+    
+    if buddy_req.status == BuddyRequest.Status.PENDING:
+        if buddy_req.sender_id == user.id:
+            return 'pending_outgoing'
+        return 'pending_incoming'
+        
+    return 'none'
+
+
+class BuddyMatchListSerializer(serializers.ListSerializer):
+    """
+    List serializer for buddy match results.
+    
+    Fetches the BuddyMatch and BuddyRequest rows for every card in one go
+    and fills in each card's `request_status` and `request_id` before
+    serializing.
+    """
+
+    def to_representation(self, data):
+        request = self.context.get('request')
+        if request:
+            user = request.user
+            match_map, request_map = get_buddy_relation_maps(
+                user, [match['user'].id for match in data]
+            )
+            for match in data:
+                other_id = match['user'].id
+                buddy_req = request_map.get(other_id)
+                match['request_status'] = get_request_status(user, match_map.get(other_id), buddy_req)
+                match['request_id'] = buddy_req.id if buddy_req else None
+        return super().to_representation(data)
+
+
 class BuddyMatchSerializer(serializers.Serializer):
     """
     Serializer for buddy match results.
@@ -42,10 +110,13 @@ class BuddyMatchSerializer(serializers.Serializer):
     match_score = serializers.FloatField(
         help_text='Compatibility score from 0-100'
     )
-    request_status = serializers.SerializerMethodField(
+    request_status = serializers.CharField(
+        default='none',
         help_text='Current status of buddy request: none, pending_outgoing, pending_incoming, accepted, rejected'
     )
-    request_id = serializers.SerializerMethodField(
+    request_id = serializers.IntegerField(
+        default=None,
+        allow_null=True,
         help_text='ID of the associated buddy request if any'
     )
 
@@ -61,6 +132,7 @@ class BuddyMatchSerializer(serializers.Serializer):
             'request_status',
             'request_id',
         ]
+        list_serializer_class = BuddyMatchListSerializer
 
     def get_matched_user_profile_picture_url(self, obj):
         """
@@ -77,74 +149,14 @@ class BuddyMatchSerializer(serializers.Serializer):
             return user.google_picture_url
         return None
 
-    def get_request_status(self, obj):
-        request = self.context.get('request')
-        if not request:
-            return 'none'
-        
-        user = request.user
-        matched_user = obj['user']
-        
-        # Check if they have a connected BuddyMatch
-        from .models import BuddyRequest, BuddyMatch
-        
-        # Check for existing match (connected or disconnected)
-        buddy_match = BuddyMatch.objects.filter(
-            (models.Q(user=user) & models.Q(matched_user=matched_user)) |
-            (models.Q(user=matched_user) & models.Q(matched_user=user))
-        ).first()
-        
-        # If they have a connected match, return 'accepted'
-        if buddy_match and buddy_match.status == BuddyMatch.Status.CONNECTED:
-            return 'accepted'
-        
-        # If they were disconnected, treat as if no connection exists
-        # Check for buddy requests
-        buddy_req = BuddyRequest.objects.filter(
-            (models.Q(sender=user) & models.Q(receiver=matched_user)) |
-            (models.Q(sender=matched_user) & models.Q(receiver=user))
-        ).first()
-        
-        if not buddy_req:
-            return 'none'
-            
-        if buddy_req.status == BuddyRequest.Status.ACCEPTED:
-            # They accepted but might have disconnected
-            if buddy_match and buddy_match.status == BuddyMatch.Status.DISCONNECTED:
-                return 'none'
-            return 'accepted'
-        if buddy_req.status == BuddyRequest.Status.REJECTED:
-             return 'rejected' 
-        
-        if buddy_req.status == BuddyRequest.Status.PENDING:
-            if buddy_req.sender == user:
-                return 'pending_outgoing'
-            return 'pending_incoming'
-            
-        return 'none'
-
-    def get_request_id(self, obj):
-        request = self.context.get('request')
-        if not request:
-            return None
-            
-        user = request.user
-        matched_user = obj['user']
-        
-        from .models import BuddyRequest
-        buddy_req = BuddyRequest.objects.filter(
-            (models.Q(sender=user) & models.Q(receiver=matched_user)) |
-            (models.Q(sender=matched_user) & models.Q(receiver=user))
-        ).first()
-        
-        return buddy_req.id if buddy_req else None
-
 
 class BuddyRequestSerializer(serializers.ModelSerializer):
     """
     Serializer for buddy requests.
     
-    Used for listing and creating buddy requests.
+    Used for listing and creating buddy requests. Sender and receiver
+    fields are read through the relations, so querysets passed in should
+    use select_related('sender', 'receiver') to avoid two queries per row.
     """
     sender_id = serializers.IntegerField(source='sender.id', read_only=True)
     sender_name = serializers.CharField(source='sender.full_name', read_only=True)
@@ -180,58 +192,63 @@ class BuddyRequestCreateSerializer(serializers.Serializer):
     def validate_receiver_id(self, value):
         sender = self.context['request'].user
         
+        # Prevent self-request (the sender always exists, so no lookup needed)
+        if sender.id == value:
+            raise serializers.ValidationError("You cannot send a request to yourself.")
+        
         # Check if receiver exists
         try:
-            receiver = User.objects.get(id=value)
+            # Name and email are all the response and notification need
+            receiver = User.objects.only('id', 'email', 'full_name').get(id=value)
         except User.DoesNotExist:
             raise serializers.ValidationError("User not found.")
         
-        # Prevent self-request
-        if sender.id == value:
-            raise serializers.ValidationError("You cannot send a request to yourself.")
+        # Reused by create() instead of fetching the receiver again
+        self._receiver = receiver
         
-        # Check if they have a disconnected buddy match
-        from .models import BuddyMatch
-        buddy_match = BuddyMatch.objects.filter(
+        # Check if they have a disconnected buddy match; only the status is
+        # read, so skip building a model instance
+        match_status = BuddyMatch.objects.filter(
             (models.Q(user=sender) & models.Q(matched_user=receiver)) |
             (models.Q(user=receiver) & models.Q(matched_user=sender))
-        ).first()
+        ).values_list('status', flat=True).first()
         
         # If they were connected before, check if they're disconnected now
-        if buddy_match and buddy_match.status == BuddyMatch.Status.DISCONNECTED:
+        if match_status == BuddyMatch.Status.DISCONNECTED:
             # Delete old accepted request if exists, to allow new request
             BuddyRequest.objects.filter(
-                (models.Q(sender=sender) & models.Q(receiver=receiver)) |
-                (models.Q(sender=receiver) & models.Q(receiver=sender))
+                _between_q(sender.id, receiver.id)
             ).delete()
             # Allow the new request
             return value
         
-        # Check for existing request (in either direction)
-        existing_request = BuddyRequest.objects.filter(
-            sender=sender, receiver=receiver
-        ).first()
+        # Fetch requests in both directions at once; (sender, receiver) is
+        # unique, so there is at most one status per sender
+        status_by_sender = dict(
+            BuddyRequest.objects.filter(
+                _between_q(sender.id, receiver.id)
+            ).values_list('sender_id', 'status')
+        )
         
-        if existing_request:
+        existing_status = status_by_sender.get(sender.id)
+        if existing_status:
             # Only block if the request is pending or accepted (and not disconnected)
-            if existing_request.status == BuddyRequest.Status.PENDING:
+            if existing_status == BuddyRequest.Status.PENDING:
                 raise serializers.ValidationError(
-                    f"You have already sent a request to this user. Status: {existing_request.status}"
+                    f"You have already sent a request to this user. Status: {existing_status}"
                 )
-            elif existing_request.status == BuddyRequest.Status.ACCEPTED:
+            elif existing_status == BuddyRequest.Status.ACCEPTED:
                 # Check if they're still connected
-                if buddy_match and buddy_match.status == BuddyMatch.Status.CONNECTED:
+                if match_status == BuddyMatch.Status.CONNECTED:
                     raise serializers.ValidationError(
                         f"You are already connected with this user."
                     )
                 # If not connected, allow new request (shouldn't reach here due to earlier check)
         
         # Check for reverse request
-        reverse_request = BuddyRequest.objects.filter(
-            sender=receiver, receiver=sender
-        ).first()
+        reverse_status = status_by_sender.get(receiver.id)
         
-        if reverse_request and reverse_request.status == BuddyRequest.Status.PENDING:
+        if reverse_status == BuddyRequest.Status.PENDING:
             raise serializers.ValidationError(
                 f"This user has already sent you a request. Please accept or reject it first."
             )
@@ -240,11 +257,10 @@ class BuddyRequestCreateSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         sender = self.context['request'].user
-        receiver = User.objects.get(id=validated_data['receiver_id'])
         
         return BuddyRequest.objects.create(
             sender=sender,
-            receiver=receiver,
+            receiver=self._receiver,
             status=BuddyRequest.Status.PENDING
         )
 
@@ -5,10 +5,17 @@ This module contains the business logic for computing buddy matches
 using rule-based matching algorithms.
 """
 
+import heapq
+import time
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch
+from django.core.cache import cache
+from django.db.models import Q
 from apps.preferences.models import Preference, Interest
 
+from .models import BuddyMatch, BuddyRequest
+
 User = get_user_model()
 
 
@@ -18,6 +25,40 @@ BUDGET_WEIGHT = 0.20
 TRAVEL_STYLE_WEIGHT = 0.20
 DURATION_WEIGHT = 0.10
 
+# Ranked matches cached per user; covers the largest limit any caller uses
+MATCH_CACHE_SIZE = 100
+MATCH_CACHE_TIMEOUT = 600
+
+# Generation counter shared by every user's cached matches
+MATCH_CACHE_VERSION_KEY = 'buddy_matches_version'
+
+# User columns read by BuddyMatchSerializer and the assistant's buddy cards
+MATCH_USER_FIELDS = (
+    'id', 'email', 'full_name', 'bio', 'profile_picture', 'google_picture_url',
+)
+
+
+def buddy_matches_cache_key(user_id) -> str:
+    """Cache key for a user's ranked matches in the current generation."""
+    # Seed with the clock so a version evicted from the cache never comes
+    # back as a value older entries were stored under
+    version = cache.get_or_set(MATCH_CACHE_VERSION_KEY, time.time_ns, None)
+    return f"buddy_matches_{user_id}_{version}"
+
+
+def invalidate_buddy_matches() -> None:
+    """
+    Retire every user's cached matches.
+    
+    Any profile change can reorder anyone's match list, so this bumps the
+    shared generation instead of deleting per-user keys. Called from
+    signal handlers.
+    """
+    try:
+        cache.incr(MATCH_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(MATCH_CACHE_VERSION_KEY, time.time_ns(), None)
+
 
 class BuddyMatchingService:
     """
@@ -39,6 +80,16 @@ class BuddyMatchingService:
         """
         self.user = user
         self.user_preferences = self._get_user_preferences(user)
+        # Taken from the prefetched interests; the same for every candidate
+        self._user_interest_ids = frozenset(
+            interest.id for interest in self.user_preferences.interests.all()
+        ) if self.user_preferences else frozenset()
+        # One bit per user interest, so a candidate's overlap is a bitmask
+        self._user_interest_bits = {
+            interest_id: 1 << position
+            for position, interest_id in enumerate(sorted(self._user_interest_ids))
+        }
+        self._build_score_tables()
 
     def _get_user_preferences(self, user):
         """
@@ -55,33 +106,68 @@ class BuddyMatchingService:
         except Preference.DoesNotExist:
             return None
 
-    def _calculate_interest_score(self, user_interests, other_interests):
+    def _build_score_tables(self):
+        """
+        Precompute the user's weighted budget, style and duration points.
+        
+        These only depend on the other user's choice for each field, so
+        scoring a candidate becomes three dict lookups instead of
+        recomputing every comparison per candidate.
+        """
+        self._budget_points = {}
+        self._style_points = {}
+        self._duration_points = {}
+        if not self.user_preferences:
+            return
+        
+        for budget in Preference.BudgetRange.values:
+            self._budget_points[budget] = self._calculate_budget_score(
+                self.user_preferences.budget_range, budget
+            ) * BUDGET_WEIGHT
+        for style in Preference.TravelStyle.values:
+            self._style_points[style] = self._calculate_exact_match_score(
+                self.user_preferences.travel_style, style
+            ) * TRAVEL_STYLE_WEIGHT
+        for duration in Preference.Duration.values:
+            self._duration_points[duration] = self._calculate_exact_match_score(
+                self.user_preferences.preferred_trip_duration, duration
+            ) * DURATION_WEIGHT
+
+    def _weighted_points(self, table, score_func, own_value, other_value, weight):
+        """
+        Look up weighted points in a precomputed table.
+        
+        Values outside the field's choices are scored once and added to the table.
+        """
+        points = table.get(other_value)
+        if points is None:
+            points = table[other_value] = score_func(own_value, other_value) * weight
+        return points
+
+    def _calculate_interest_score(self, shared_count, other_count):
         """
         Calculate interest overlap score.
         
         Uses Jaccard similarity coefficient:
-        intersection / union * 100
+        intersection / union * 100, with the union size taken as
+        |user| + |other| - |intersection|
         
         Args:
-            user_interests: Set of interest IDs for the user
-            other_interests: Set of interest IDs for the other user
+            shared_count: Number of interests both users have
+            other_count: Number of interests the other user has
             
         Returns:
             Float score from 0-100
         """
-        if not user_interests and not other_interests:
+        user_count = len(self._user_interest_ids)
+        if not user_count and not other_count:
             return 50.0  # Neutral score if both have no interests
         
-        if not user_interests or not other_interests:
-            return 0.0
-        
-        intersection = user_interests & other_interests
-        union = user_interests | other_interests
-        
-        if not union:
+        if not user_count or not other_count:
             return 0.0
         
-        return (len(intersection) / len(union)) * 100
+        union_count = user_count + other_count - shared_count
+        return (shared_count / union_count) * 100
 
     def _calculate_exact_match_score(self, value1, value2):
         """
@@ -128,59 +214,94 @@ class BuddyMatchingService:
         except ValueError:
             return 0.0
 
-    def _calculate_match_score(self, other_preferences):
+    def _score_candidate(self, shared_count, other_count,
+                         budget_range, travel_style, trip_duration):
         """
-        Calculate overall match score between the user and another user.
+        Calculate the weighted match score from another user's raw field values.
         
         Args:
-            other_preferences: Preference instance of the other user
+            shared_count: Number of interests both users have
+            other_count: Number of interests the other user has
+            budget_range: Other user's budget range
+            travel_style: Other user's travel style
+            trip_duration: Other user's preferred trip duration
             
         Returns:
-            Tuple of (score, shared_interests_list)
+            Rounded float score from 0-100
         """
-        if not self.user_preferences or not other_preferences:
-            return 0.0, []
-
-        # Get interest IDs
-        user_interest_ids = set(
-            self.user_preferences.interests.values_list('id', flat=True)
-        )
-        other_interest_ids = set(
-            other_preferences.interests.values_list('id', flat=True)
+        interest_score = self._calculate_interest_score(shared_count, other_count)
+        # Weighted points for the other fields come from the precomputed tables
+        budget_points = self._weighted_points(
+            self._budget_points, self._calculate_budget_score,
+            self.user_preferences.budget_range, budget_range,
+            BUDGET_WEIGHT
         )
-
-        # Calculate individual scores
-        interest_score = self._calculate_interest_score(
-            user_interest_ids, other_interest_ids
-        )
-        budget_score = self._calculate_budget_score(
-            self.user_preferences.budget_range,
-            other_preferences.budget_range
-        )
-        style_score = self._calculate_exact_match_score(
-            self.user_preferences.travel_style,
-            other_preferences.travel_style
+        style_points = self._weighted_points(
+            self._style_points, self._calculate_exact_match_score,
+            self.user_preferences.travel_style, travel_style,
+            TRAVEL_STYLE_WEIGHT
         )
-        duration_score = self._calculate_exact_match_score(
-            self.user_preferences.preferred_trip_duration,
-            other_preferences.preferred_trip_duration
+        duration_points = self._weighted_points(
+            self._duration_points, self._calculate_exact_match_score,
+            self.user_preferences.preferred_trip_duration, trip_duration,
+            DURATION_WEIGHT
         )
 
         # Calculate weighted total
         total_score = (
             interest_score * INTEREST_WEIGHT +
-            budget_score * BUDGET_WEIGHT +
-            style_score * TRAVEL_STYLE_WEIGHT +
-            duration_score * DURATION_WEIGHT
+            budget_points +
+            style_points +
+            duration_points
         )
+        return round(total_score, 1)
 
-        # Get shared interest names
-        shared_interest_ids = user_interest_ids & other_interest_ids
-        shared_interests = list(
-            Interest.objects.filter(id__in=shared_interest_ids).values_list('name', flat=True)
-        )
+    def _load_interest_names(self, interest_ids):
+        """
+        Fetch names for a set of interests in one query.
+        
+        Args:
+            interest_ids: Iterable of interest IDs
+            
+        Returns:
+            Dict of interest ID to name, in interest ordering
+        """
+        if not interest_ids:
+            return {}
+        return dict(Interest.objects.filter(id__in=interest_ids).values_list('id', 'name'))
+
+    def _shared_interest_names(self, shared_interest_ids, interest_names):
+        """Names of the shared interests, in the order of interest_names."""
+        return [
+            name for interest_id, name in interest_names.items()
+            if interest_id in shared_interest_ids
+        ]
+
+    def _calculate_match_score(self, other_preferences):
+        """
+        Calculate overall match score between the user and another user.
+        
+        Args:
+            other_preferences: Preference instance of the other user
+            
+        Returns:
+            Float score
+        """
+        if not self.user_preferences or not other_preferences:
+            return 0.0
 
-        return round(total_score, 1), shared_interests
+        # Read from the prefetched interests cache instead of re-querying
+        other_interest_ids = {
+            interest.id for interest in other_preferences.interests.all()
+        }
+        shared_interest_ids = self._user_interest_ids & other_interest_ids
+
+        return self._score_candidate(
+            len(shared_interest_ids), len(other_interest_ids),
+            other_preferences.budget_range,
+            other_preferences.travel_style,
+            other_preferences.preferred_trip_duration
+        )
 
     def get_matches(self, limit=10, min_score=0.0):
         """
@@ -193,29 +314,120 @@ class BuddyMatchingService:
         Returns:
             List of dicts with match information
         """
+        return self.build_matches(self.get_ranked_matches(limit, min_score))
+
+    def get_ranked_matches(self, limit=10, min_score=0.0):
+        """
+        Get the ranked match IDs and scores for the user, without loading users.
+        
+        The top MATCH_CACHE_SIZE matches are cached until a profile,
+        preference or interest changes; smaller limits and score thresholds
+        are served from that list. Only plain values are cached.
+        
+        Args:
+            limit: Maximum number of matches to return
+            min_score: Minimum match score threshold
+            
+        Returns:
+            List of (user_id, match_score, shared_interest_ids) tuples sorted
+            by score descending; pass a page of them to build_matches()
+        """
         if not self.user_preferences:
             return []
 
-        # Get all users with preferences, excluding current user
-        other_users_with_prefs = Preference.objects.select_related('user').prefetch_related(
-            'interests'
-        ).exclude(user=self.user)
+        if limit <= MATCH_CACHE_SIZE:
+            cache_key = buddy_matches_cache_key(self.user.id)
+            ranked = cache.get(cache_key)
+            if ranked is None:
+                ranked = self._rank_matches(MATCH_CACHE_SIZE)
+                cache.set(cache_key, ranked, MATCH_CACHE_TIMEOUT)
+        else:
+            ranked = self._rank_matches(limit)
+
+        # Matches are sorted by score, so those above the threshold are a prefix
+        return [match for match in ranked if match[1] >= min_score][:limit]
 
-        matches = []
-        for other_pref in other_users_with_prefs:
-            score, shared_interests = self._calculate_match_score(other_pref)
+    def build_matches(self, ranked):
+        """
+        Load the users and shared interest names for ranked matches.
+        
+        Args:
+            ranked: (user_id, match_score, shared_interest_ids) tuples from
+                get_ranked_matches()
             
-            if score >= min_score:
-                matches.append({
-                    'user': other_pref.user,
-                    'match_score': score,
-                    'shared_interests': shared_interests,
-                })
+        Returns:
+            List of match dicts in the same order, skipping users deleted
+            since they were ranked
+        """
+        users = User.objects.only(*MATCH_USER_FIELDS).in_bulk(
+            [user_id for user_id, _, _ in ranked]
+        )
+        # One name lookup for every interest shared with a returned match
+        interest_names = self._load_interest_names(
+            set().union(*(shared_ids for _, _, shared_ids in ranked))
+        )
+        return [
+            {
+                'user': users[user_id],
+                'match_score': score,
+                'shared_interests': self._shared_interest_names(shared_ids, interest_names),
+            }
+            for user_id, score, shared_ids in ranked
+            if user_id in users
+        ]
+
+    def _rank_matches(self, limit):
+        """
+        Score every other user with preferences and return the best matches.
+        
+        Args:
+            limit: Maximum number of matches to return
+            
+        Returns:
+            List of (user_id, match_score, shared_interest_ids) tuples sorted
+            by score descending
+        """
+        # Load only the scored columns as plain rows, plus every candidate's
+        # interests in one through-table query
+        candidates = Preference.objects.exclude(user=self.user).values_list(
+            'id', 'user_id', 'budget_range', 'travel_style', 'preferred_trip_duration'
+        )
+        interest_rows = Preference.interests.through.objects.exclude(
+            preference_id=self.user_preferences.id
+        ).values_list('preference_id', 'interest_id')
 
-        # Sort by score descending
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        # Jaccard only needs each candidate's interest count and overlap, so
+        # keep a count plus a bitmask over the user's interests, not a set
+        interest_counts = defaultdict(int)
+        shared_masks = defaultdict(int)
+        user_bits = self._user_interest_bits
+        for pref_id, interest_id in interest_rows:
+            interest_counts[pref_id] += 1
+            bit = user_bits.get(interest_id)
+            if bit:
+                shared_masks[pref_id] |= bit
 
-        return matches[:limit]
+        scored = []
+        for pref_id, user_id, budget_range, travel_style, trip_duration in candidates:
+            shared_mask = shared_masks.get(pref_id, 0)
+            score = self._score_candidate(
+                shared_mask.bit_count(), interest_counts.get(pref_id, 0),
+                budget_range, travel_style, trip_duration
+            )
+            scored.append((score, user_id, shared_mask))
+
+        # Keep the top `limit` by score without sorting every candidate;
+        # nlargest keeps ties in candidate order, like a stable sort
+        scored = heapq.nlargest(limit, scored, key=lambda x: x[0])
+
+        return [
+            (
+                user_id,
+                score,
+                tuple(interest_id for interest_id, bit in user_bits.items() if shared_mask & bit),
+            )
+            for score, user_id, shared_mask in scored
+        ]
 
     def calculate_score_for_user(self, other_user):
         """
@@ -229,8 +441,7 @@ class BuddyMatchingService:
         """
         try:
             other_pref = Preference.objects.prefetch_related('interests').get(user=other_user)
-            score, _ = self._calculate_match_score(other_pref)
-            return score
+            return self._calculate_match_score(other_pref)
         except Preference.DoesNotExist:
             return 0.0
 
@@ -249,3 +460,37 @@ def get_buddy_matches(user, limit=10, min_score=0.0):
     """
     service = BuddyMatchingService(user)
     return service.get_matches(limit=limit, min_score=min_score)
+
+
+def get_buddy_relation_maps(user, other_ids):
+    """
+    Fetch the BuddyMatch and BuddyRequest rows between a user and others.
+    
+    Args:
+        user: The authenticated user
+        other_ids: IDs of the other users
+        
+    Returns:
+        Tuple of (match map, request map), each keyed by the other user's ID.
+        Where both directions exist, the row `.first()` would pick under the
+        model's default ordering wins.
+    """
+    match_map = {}
+    buddy_matches = BuddyMatch.objects.filter(
+        Q(user=user, matched_user_id__in=other_ids) |
+        Q(matched_user=user, user_id__in=other_ids)
+    ).only('user_id', 'matched_user_id', 'status').order_by('match_score', 'created_at')
+    for buddy_match in buddy_matches:
+        other_id = buddy_match.matched_user_id if buddy_match.user_id == user.id else buddy_match.user_id
+        match_map[other_id] = buddy_match
+    
+    request_map = {}
+    buddy_requests = BuddyRequest.objects.filter(
+        Q(sender=user, receiver_id__in=other_ids) |
+        Q(receiver=user, sender_id__in=other_ids)
+    ).only('sender_id', 'receiver_id', 'status').order_by('created_at')
+    for buddy_req in buddy_requests:
+        other_id = buddy_req.receiver_id if buddy_req.sender_id == user.id else buddy_req.sender_id
+        request_map[other_id] = buddy_req
+    
+    return match_map, request_map
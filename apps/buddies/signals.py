@@ -0,0 +1,50 @@
+"""
+Signals for buddy match cache invalidation.
+
+Retires every cached match list whenever data that scoring reads changes.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.preferences.models import Preference, Interest
+
+from .services import invalidate_buddy_matches
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def invalidate_matches_on_user_save(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which matches never show
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_buddy_matches()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_matches_on_user_delete(sender, instance, **kwargs):
+    invalidate_buddy_matches()
+
+
+@receiver([post_save, post_delete], sender=Preference)
+def invalidate_matches_on_preference_change(sender, instance, **kwargs):
+    invalidate_buddy_matches()
+
+
+@receiver(m2m_changed, sender=Preference.interests.through)
+def invalidate_matches_on_interests_change(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_buddy_matches()
+
+
+@receiver([post_save, post_delete], sender=Preference.interests.through)
+def invalidate_matches_on_preference_interest_change(sender, instance, **kwargs):
+    invalidate_buddy_matches()
+
+
+@receiver([post_save, post_delete], sender=Interest)
+def invalidate_matches_on_interest_change(sender, instance, **kwargs):
+    # Shared interest names are part of the cached matches
+    invalidate_buddy_matches()
@@ -6,11 +6,12 @@ This module defines API views for buddy matching and buddy requests.
 
 from rest_framework import views, status, permissions, generics
 from rest_framework.response import Response
+from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 
-from .services import get_buddy_matches
-from .models import BuddyRequest
-from django.db import models
+from .services import BuddyMatchingService, get_buddy_matches
+from .models import BuddyMatch, BuddyRequest
+from django.db import models, transaction
 from .serializers import (
     BuddyMatchSerializer,
     BuddyRequestSerializer,
@@ -18,6 +19,9 @@ from .serializers import (
     BuddyRequestActionSerializer,
 )
 from apps.notifications.models import Notification
+from apps.preferences.models import Interest
+
+User = get_user_model()
 
 
 class BuddyMatchListView(views.APIView):
@@ -93,23 +97,29 @@ class BuddyRequestListCreateView(views.APIView):
             queryset = BuddyRequest.objects.filter(sender=user)
         else:
             # All requests where user is sender or receiver
-            from django.db.models import Q
             queryset = BuddyRequest.objects.filter(
-                Q(sender=user) | Q(receiver=user)
+                models.Q(sender=user) | models.Q(receiver=user)
             )
 
         # Apply status filter if provided
         if status_filter and status_filter in ['pending', 'accepted', 'rejected']:
             queryset = queryset.filter(status=status_filter)
 
-        # Optimize queries
-        queryset = queryset.select_related('sender', 'receiver')
+        # Optimize queries: join both users and load only serialized columns
+        queryset = queryset.select_related('sender', 'receiver').only(
+            'id', 'status', 'created_at',
+            'sender__id', 'sender__email', 'sender__full_name',
+            'receiver__id', 'receiver__email', 'receiver__full_name',
+        )
 
         serializer = BuddyRequestSerializer(queryset, many=True)
+        results = serializer.data
         
+        # The list is unpaginated, so count the serialized rows instead of
+        # running a separate COUNT query
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data
+            'count': len(results),
+            'results': results
         }, status=status.HTTP_200_OK)
 
     def post(self, request):
@@ -147,39 +157,34 @@ class BuddyRequestAcceptView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        buddy_request = get_object_or_404(
-            BuddyRequest.objects.select_related('sender', 'receiver'),
-            pk=pk
-        )
-        
-        serializer = BuddyRequestActionSerializer(
-            data={'action': 'accept'},
-            context={'request': request, 'buddy_request': buddy_request}
-        )
-        
-        if serializer.is_valid():
-            updated_request = serializer.save()
+        # Lock the request row for the whole accept, so a concurrent accept
+        # waits and then fails validation on the updated status instead of
+        # creating duplicate matches and notifications
+        with transaction.atomic():
+            buddy_request = get_object_or_404(
+                BuddyRequest.objects.select_for_update(of=('self',)).select_related(
+                    'sender', 'receiver'
+                ),
+                pk=pk
+            )
+            
+            serializer = BuddyRequestActionSerializer(
+                data={'action': 'accept'},
+                context={'request': request, 'buddy_request': buddy_request}
+            )
             
-            # Create symmetric BuddyMatch records
-            from .models import BuddyMatch
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            # Calculate match score
-            from .services import BuddyMatchingService
+            updated_request = serializer.save()
+            
+            # Calculate match score for the symmetric BuddyMatch records
             service = BuddyMatchingService(updated_request.sender)
             match_score = service.calculate_score_for_user(updated_request.receiver)
 
-            # Create match A -> B
-            BuddyMatch.objects.get_or_create(
-                user=updated_request.sender,
-                matched_user=updated_request.receiver,
-                defaults={'match_score': match_score}
-            )
-            
-            # Create match B -> A
-            BuddyMatch.objects.get_or_create(
-                user=updated_request.receiver,
-                matched_user=updated_request.sender,
-                defaults={'match_score': match_score}
+            # Create matches A -> B and B -> A, keeping any that already exist
+            BuddyMatch.create_pair(
+                updated_request.sender, updated_request.receiver, match_score
             )
             
             # Create notification for sender that their request was accepted
@@ -188,11 +193,9 @@ class BuddyRequestAcceptView(views.APIView):
                 receiver=updated_request.receiver,
                 buddy_request_id=updated_request.id
             )
-            
-            response_serializer = BuddyRequestSerializer(updated_request)
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        response_serializer = BuddyRequestSerializer(updated_request)
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
 
 
 class BuddyRequestRejectView(views.APIView):
@@ -205,17 +208,23 @@ class BuddyRequestRejectView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        buddy_request = get_object_or_404(
-            BuddyRequest.objects.select_related('sender', 'receiver'),
-            pk=pk
-        )
-        
-        serializer = BuddyRequestActionSerializer(
-            data={'action': 'reject'},
-            context={'request': request, 'buddy_request': buddy_request}
-        )
-        
-        if serializer.is_valid():
+        # Lock the request row so concurrent rejects cannot both notify
+        with transaction.atomic():
+            buddy_request = get_object_or_404(
+                BuddyRequest.objects.select_for_update(of=('self',)).select_related(
+                    'sender', 'receiver'
+                ),
+                pk=pk
+            )
+            
+            serializer = BuddyRequestActionSerializer(
+                data={'action': 'reject'},
+                context={'request': request, 'buddy_request': buddy_request}
+            )
+            
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            
             updated_request = serializer.save()
             
             # Create notification for sender that their request was rejected
@@ -224,11 +233,9 @@ class BuddyRequestRejectView(views.APIView):
                 receiver=updated_request.receiver,
                 buddy_request_id=updated_request.id
             )
-            
-            response_serializer = BuddyRequestSerializer(updated_request)
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        response_serializer = BuddyRequestSerializer(updated_request)
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
 
 
 class AcceptedBuddiesListView(views.APIView):
@@ -241,29 +248,28 @@ class AcceptedBuddiesListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        from .models import BuddyMatch
+        # Primary interest is the buddy's first interest by name, picked in SQL
+        # so no preferences or interests are loaded
+        primary_interest = Interest.objects.filter(
+            preferences__user=models.OuterRef('matched_user')
+        ).order_by('name').values('name')[:1]
         
         # Get all connected matches for the user (excluding disconnected)
         # Order by match score descending to show best matches first
         matches = BuddyMatch.objects.filter(
             user=request.user,
             status=BuddyMatch.Status.CONNECTED
-        ).select_related('matched_user', 'matched_user__preferences'
-        ).prefetch_related('matched_user__preferences__interests'
+        ).select_related('matched_user').annotate(
+            primary_interest=models.Subquery(primary_interest)
+        ).only(
+            # Only the columns the response reads
+            'match_score', 'created_at',
+            'matched_user__id', 'matched_user__full_name', 'matched_user__email',
+            'matched_user__profile_picture',
         ).order_by('-match_score', 'matched_user__full_name')
         
         buddies = []
         for match in matches:
-            # Get primary interest (first interest if available)
-            primary_interest = None
-            try:
-                if hasattr(match.matched_user, 'preferences'):
-                    first_interest = match.matched_user.preferences.interests.first()
-                    if first_interest:
-                        primary_interest = first_interest.name
-            except Exception:
-                pass
-            
             # Build profile picture URL
             avatar_url = None
             if match.matched_user.profile_picture:
@@ -277,7 +283,7 @@ class AcceptedBuddiesListView(views.APIView):
                 'full_name': match.matched_user.full_name or match.matched_user.email.split('@')[0],
                 'email': match.matched_user.email,
                 'avatar_url': avatar_url,
-                'primary_interest': primary_interest,
+                'primary_interest': match.primary_interest,
                 'match_score': match.match_score,
                 'connected_at': match.created_at,
             })
@@ -324,10 +330,6 @@ class DisconnectBuddyView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, user_id):
-        from .models import BuddyMatch
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
         target_user = get_object_or_404(User, pk=user_id)
         current_user = request.user
         
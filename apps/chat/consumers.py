@@ -12,6 +12,28 @@ from .models import ChatRoom, Message
 from .permissions import is_accepted_trip_member
 
 
+def build_chat_message_event(message_data):
+    """
+    Build the group event broadcasting a chat message to a trip room.
+    
+    The outbound frame is encoded once here instead of in every
+    recipient's consumer. Recipients differ only in the `is_me` flag, so
+    the event carries one frame for the sender and one for everyone else.
+    """
+    def encode(is_me):
+        return json.dumps({
+            'type': 'chat_message',
+            'message': {**message_data, 'is_me': is_me}
+        })
+    
+    return {
+        'type': 'chat_message',
+        'sender_id': message_data.get('sender_id'),
+        'frame': encode(False),
+        'sender_frame': encode(True),
+    }
+
+
 class ChatConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for trip chat rooms.
@@ -47,6 +69,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.trip_id = self.scope['url_route']['kwargs']['trip_id']
         self.room_group_name = f'trip_{self.trip_id}'
         self.user = self.scope.get('user')
+        # Resolved on the first message sent over this connection
+        self.chat_room_id = None
         
         # Reject anonymous users
         if isinstance(self.user, AnonymousUser) or not self.user.is_authenticated:
@@ -133,10 +157,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Broadcast to room group
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message': message_data
-            }
+            build_chat_message_event(message_data)
         )
     
     async def handle_typing(self, data):
@@ -160,15 +181,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
         Send chat message to WebSocket.
         Called when a message is broadcast to the group.
         """
-        message = event['message']
-        
-        # Add is_me flag for the recipient
-        message['is_me'] = message.get('sender_id') == self.user.id
-        
-        await self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'message': message
-        }))
+        # Frames arrive pre-encoded; pick the one with this recipient's is_me flag
+        if event['sender_id'] == self.user.id:
+            await self.send(text_data=event['sender_frame'])
+        else:
+            await self.send(text_data=event['frame'])
     
     async def user_typing(self, event):
         """
@@ -235,14 +252,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
         Save a new message to the database.
         """
         try:
-            # Get or create chat room
-            from apps.trips.models import Trip
-            trip = Trip.objects.get(id=self.trip_id)
-            chat_room, _ = ChatRoom.objects.get_or_create(trip=trip)
+            # Get or create chat room once per connection; a trip's room
+            # never changes
+            if self.chat_room_id is None:
+                chat_room, _ = ChatRoom.objects.get_or_create(trip_id=self.trip_id)
+                self.chat_room_id = chat_room.id
             
             # Create message
             message = Message.objects.create(
-                room=chat_room,
+                room_id=self.chat_room_id,
                 sender=self.user,
                 content=content,
                 is_system=False
@@ -2,16 +2,47 @@
 JWT Authentication middleware for Django Channels WebSocket connections.
 Validates JWT tokens passed via query string or headers.
 """
-from urllib.parse import parse_qs
+from urllib.parse import unquote_plus
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# How long a resolved handshake user is reused across reconnects (seconds)
+WS_USER_CACHE_TIMEOUT = 60
+
+# User columns the chat consumer reads; only these are loaded and cached
+WS_USER_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'full_name', 'email', 'is_active')
+]
+
+
+def ws_user_cache_key(user_id) -> str:
+    """Cache key for the user resolved from a WebSocket handshake token."""
+    return f"chat_ws_user_{user_id}"
+
+
+def get_token_from_query_string(query_string):
+    """
+    Return the first non-empty `token` query parameter, or None.
+    
+    Scans the raw bytes for the one parameter needed instead of parsing
+    every parameter into a dict; the value is unquoted like parse_qs does.
+    """
+    for part in query_string.split(b'&'):
+        if part.startswith(b'token='):
+            token = unquote_plus(part[6:].decode())
+            if token:
+                return token
+    return None
+
 
 @database_sync_to_async
 def get_user_from_token(token_string):
@@ -23,8 +54,20 @@ def get_user_from_token(token_string):
         access_token = AccessToken(token_string)
         user_id = access_token['user_id']
         
-        # Get the user
-        user = User.objects.get(id=user_id)
+        # Get the user, reusing a recent lookup so reconnect bursts skip the
+        # query. Only plain column values are cached, never the model
+        # instance with its password hash and permission flags.
+        key = ws_user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = User.objects.only(*WS_USER_FIELDS).get(id=user_id)
+            values = [getattr(user, field) for field in WS_USER_FIELDS]
+            cache.set(key, values, WS_USER_CACHE_TIMEOUT)
+        else:
+            user = User.from_db(router.db_for_read(User), WS_USER_FIELDS, values)
+        
+        if not user.is_active:
+            return AnonymousUser()
         return user
     except (TokenError, InvalidToken, User.DoesNotExist):
         return AnonymousUser()
@@ -40,9 +83,7 @@ class JWTAuthMiddleware(BaseMiddleware):
     
     async def __call__(self, scope, receive, send):
         # Try to get token from query string first
-        query_string = scope.get('query_string', b'').decode()
-        query_params = parse_qs(query_string)
-        token = query_params.get('token', [None])[0]
+        token = get_token_from_query_string(scope.get('query_string', b''))
         
         # If no token in query string, check subprotocols
         if not token:
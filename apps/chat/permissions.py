@@ -1,5 +1,51 @@
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import permissions
 from apps.trips.models import TripMember
+from config.cache import cache_is_shared
+
+# How long a membership check result is reused (seconds); only cached when
+# the cache is shared, so every process sees the invalidation on change
+TRIP_MEMBERSHIP_CACHE_TIMEOUT = 60
+
+
+def trip_membership_cache_key(trip_id, user_id) -> str:
+    """Cache key for whether a user is an accepted member of a trip."""
+    return f"chat_trip_member_{trip_id}_{user_id}"
+
+
+def invalidate_trip_membership(trip_id, user_id) -> None:
+    """
+    Drop a cached membership check once the current transaction commits.
+    
+    Deferring to commit keeps a concurrent check from caching the old
+    membership again before the change is visible.
+    """
+    key = trip_membership_cache_key(trip_id, user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _is_accepted_member(user_id, trip_id):
+    """
+    Check accepted membership, reusing a recent result from a shared cache.
+    
+    With a per-process cache a removed member would keep access in other
+    processes until the entry expired, so the check always hits the database.
+    """
+    membership = TripMember.objects.filter(
+        trip_id=trip_id,
+        user_id=user_id,
+        status=TripMember.MembershipStatus.ACCEPTED
+    )
+    if not cache_is_shared():
+        return membership.exists()
+    
+    key = trip_membership_cache_key(trip_id, user_id)
+    is_member = cache.get(key)
+    if is_member is None:
+        is_member = membership.exists()
+        cache.set(key, is_member, TRIP_MEMBERSHIP_CACHE_TIMEOUT)
+    return is_member
 
 
 class IsTripMemberAccepted(permissions.BasePermission):
@@ -19,11 +65,7 @@ class IsTripMemberAccepted(permissions.BasePermission):
             return False
         
         # Check if user is the trip creator or an accepted member
-        return TripMember.objects.filter(
-            trip_id=trip_id,
-            user=user,
-            status=TripMember.MembershipStatus.ACCEPTED
-        ).exists()
+        return _is_accepted_member(user.id, trip_id)
 
 
 def is_accepted_trip_member(user, trip_id):
@@ -34,8 +76,4 @@ def is_accepted_trip_member(user, trip_id):
     if not user or not user.is_authenticated:
         return False
     
-    return TripMember.objects.filter(
-        trip_id=trip_id,
-        user=user,
-        status=TripMember.MembershipStatus.ACCEPTED
-    ).exists()
+    return _is_accepted_member(user.id, trip_id)
@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from apps.trips.models import Trip
+from apps.trips.models import Trip, TripMember
 from .models import ChatRoom
+from .middleware import ws_user_cache_key
+from .permissions import invalidate_trip_membership
+
+User = get_user_model()
 
 
 @receiver(post_save, sender=Trip)
@@ -11,3 +17,19 @@ def create_chat_room_for_trip(sender, instance, created, **kwargs):
     """
     if created:
         ChatRoom.objects.create(trip=instance)
+
+
+@receiver([post_save, post_delete], sender=TripMember)
+def invalidate_membership_on_member_change(sender, instance, **kwargs):
+    """
+    Drop the cached chat membership check when a membership changes.
+    """
+    invalidate_trip_membership(instance.trip_id, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_ws_user_on_user_change(sender, instance, **kwargs):
+    """
+    Drop the cached WebSocket handshake user when the user changes.
+    """
+    cache.delete(ws_user_cache_key(instance.pk))
@@ -10,6 +10,7 @@ from apps.trips.models import Trip
 from .models import ChatRoom, Message, Poll, PollOption, PollVote
 from .serializers import MessageSerializer, MessageCreateSerializer, PollSerializer
 from .permissions import IsTripMemberAccepted
+from .consumers import build_chat_message_event
 
 
 def _serialize_poll_for_ws(poll):
@@ -140,7 +141,7 @@ class PollCreateView(APIView):
         channel_layer = get_channel_layer()
         async_to_sync(channel_layer.group_send)(
             f'trip_{trip_id}',
-            {'type': 'chat_message', 'message': message_data}
+            build_chat_message_event(message_data)
         )
 
         serializer = MessageSerializer(message, context={'request': request})
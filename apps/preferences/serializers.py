@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Preference, Interest, PreferenceInterest
+from .models import Preference, Interest
 
 class InterestSerializer(serializers.ModelSerializer):
     is_mine = serializers.SerializerMethodField()
@@ -64,12 +64,8 @@ class PreferenceSerializer(serializers.ModelSerializer):
 
         preference = Preference.objects.create(user=user, **validated_data)
         
-        # Create M2M relations
-        for interest_id in interest_ids:
-            PreferenceInterest.objects.create(
-                preference=preference,
-                interest_id=interest_id
-            )
+        # Create M2M relations in one insert (sends m2m_changed)
+        preference.interests.add(*interest_ids)
         
         return preference
 
@@ -83,14 +79,8 @@ class PreferenceSerializer(serializers.ModelSerializer):
         
         # Update interests if provided
         if interest_ids is not None:
-            # Clear existing interests
-            instance.interests.clear()
-            # Add new interests
-            for interest_id in interest_ids:
-                PreferenceInterest.objects.create(
-                    preference=instance,
-                    interest_id=interest_id
-                )
+            # Replace existing interests (sends m2m_changed)
+            instance.interests.set(interest_ids)
                 
         return instance
 
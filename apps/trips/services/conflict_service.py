@@ -12,6 +12,8 @@ from django.utils import timezone
 
 from apps.trips.models import Trip, TripMember
 from apps.chat.models import ChatRoom, Message
+from apps.chat.permissions import invalidate_trip_membership
+from apps.assistant.services.context_builder import invalidate_user_context
 from apps.notifications.models import Notification
 
 logger = logging.getLogger(__name__)
@@ -109,6 +111,10 @@ def accept_with_conflict_resolution(user, new_trip, conflicting_trip_ids=None):
             ).exclude(status=TripMember.MembershipStatus.LEFT)
 
         updated = membership_qs.update(status=TripMember.MembershipStatus.LEFT)
+        # update() sends no signals, so drop the cached chat access and
+        # assistant context directly
+        invalidate_trip_membership(old_trip.id, user.id)
+        invalidate_user_context(user.id, old_trip.creator_id)
 
         if updated:
             # 2b. System message in old trip chat --------------------------------
@@ -102,18 +102,44 @@ class WeatherService:
         Returns:
             Weather data dictionary or None
         """
+        # Check cache first
+        cached = self.get_cached_weather_for_trips([trip])
+        if trip.id in cached:
+            logger.info(f"Using cached weather for trip {trip.id}")
+            return cached[trip.id]
+        
+        lat, lon, location_source = self.get_trip_coordinates(trip)
+        if lat is None or lon is None:
+            return None
+        
+        # Fetch fresh weather data
+        weather_data = self.get_weather_by_coords(lat, lon)
+        
+        if weather_data:
+            self.save_trip_weather(trip, weather_data, location_source)
+        
+        return weather_data
+    
+    def get_cached_weather_for_trips(self, trips) -> Dict[int, Dict[str, Any]]:
+        """
+        Get fresh cached weather for several trips in one query.
+        
+        Args:
+            trips: Trip model instances
+            
+        Returns:
+            Dictionary mapping trip ID to weather data, for trips with a
+            fresh cache entry only
+        """
         from apps.trips.models import TripWeatherCache
-        from apps.recommendations.models import TripSavedDestination
         
-        # Check cache first
         cache_cutoff = timezone.now() - timedelta(minutes=self.cache_minutes)
-        try:
-            cache = TripWeatherCache.objects.get(
-                trip=trip,
-                last_updated__gte=cache_cutoff
-            )
-            logger.info(f"Using cached weather for trip {trip.id}")
-            return {
+        entries = TripWeatherCache.objects.filter(
+            trip__in=trips,
+            last_updated__gte=cache_cutoff
+        )
+        return {
+            cache.trip_id: {
                 'temperature': cache.temperature,
                 'condition': cache.condition,
                 'description': cache.description,
@@ -122,10 +148,22 @@ class WeatherService:
                 'cached': True,
                 'last_updated': cache.last_updated.isoformat(),
             }
-        except TripWeatherCache.DoesNotExist:
-            pass
+            for cache in entries
+        }
+    
+    def get_trip_coordinates(self, trip):
+        """
+        Determine the coordinates to fetch a trip's weather for.
+        
+        Args:
+            trip: Trip model instance
+            
+        Returns:
+            Tuple of (lat, lon, location source), or (None, None, None) if
+            the trip has no coordinates
+        """
+        from apps.recommendations.models import TripSavedDestination
         
-        # Determine coordinates to use
         lat, lon = None, None
         location_source = None
         
@@ -154,29 +192,33 @@ class WeatherService:
         
         if lat is None or lon is None:
             logger.warning(f"No coordinates available for trip {trip.id}")
-            return None
+            return None, None, None
         
-        # Fetch fresh weather data
-        weather_data = self.get_weather_by_coords(lat, lon)
+        return lat, lon, location_source
+    
+    def save_trip_weather(self, trip, weather_data: Dict[str, Any], location_source: str) -> None:
+        """
+        Cache freshly fetched weather for a trip.
         
-        if weather_data:
-            # Update cache
-            TripWeatherCache.objects.update_or_create(
-                trip=trip,
-                defaults={
-                    'temperature': weather_data['temperature'],
-                    'condition': weather_data['condition'],
-                    'description': weather_data['description'],
-                    'icon': weather_data['icon'],
-                    'city_name': weather_data.get('city_name', trip.city or ''),
-                    'last_updated': timezone.now(),
-                }
-            )
-            
-            weather_data['cached'] = False
-            weather_data['location_source'] = location_source
+        Also marks weather_data as uncached and records where its
+        coordinates came from.
+        """
+        from apps.trips.models import TripWeatherCache
         
-        return weather_data
+        TripWeatherCache.objects.update_or_create(
+            trip=trip,
+            defaults={
+                'temperature': weather_data['temperature'],
+                'condition': weather_data['condition'],
+                'description': weather_data['description'],
+                'icon': weather_data['icon'],
+                'city_name': weather_data.get('city_name', trip.city or ''),
+                'last_updated': timezone.now(),
+            }
+        )
+        
+        weather_data['cached'] = False
+        weather_data['location_source'] = location_source
     
     def get_icon_url(self, icon_code: str) -> str:
         """Get the full URL for a weather icon."""
@@ -0,0 +1,18 @@
+"""
+Cache helpers shared across apps.
+"""
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_is_shared() -> bool:
+    """
+    Whether the default cache is shared by every server process.
+    
+    LocMem (and dummy) caches live in one process, so a delete made by the
+    process handling a write never reaches the others. Caches that rely on
+    invalidation for correctness should only be used when this is True.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
@@ -111,6 +111,25 @@ CHANNEL_LAYERS = {
     },
 }
 
+# =============================================================================
+# CACHE
+# =============================================================================
+
+# The default LocMem cache is private to each process. Background assistant
+# replies (`"background": true`) need a cache shared by every process and
+# answer 503 until one such as Redis is configured.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # For production, use Redis:
+        # 'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        # 'LOCATION': 'redis://127.0.0.1:6379',
+    },
+}
+
+ASSISTANT_REPLY_TASK_WORKERS = int(os.getenv('ASSISTANT_REPLY_TASK_WORKERS', '4'))
+ASSISTANT_REPLY_TASK_QUEUE_SIZE = int(os.getenv('ASSISTANT_REPLY_TASK_QUEUE_SIZE', '16'))
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases